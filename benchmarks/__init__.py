@@ -0,0 +1,5 @@
+"""Benchmarks for the OmniLogic Local integration hot paths.
+
+Each benchmark module can be run directly, e.g. `python -m benchmarks.device_walk`, and prints its results as JSON.
+`python -m benchmarks.suite` runs the end-to-end suite and can compare its results against an earlier run.
+"""
@@ -0,0 +1,71 @@
+"""Compare the recursive device_walk that shipped up to 0.7.14 with the current iterative, cached walker."""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from typing import TYPE_CHECKING
+
+from pyomnilogic_local.models.mspconfig import MSPConfig, OmniBase
+from pyomnilogic_local.omnitypes import OmniType
+
+from custom_components.omnilogic_local.utils import _device_walk, device_walk
+
+from .synthetic import build_mspconfig
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+DEVICE_COUNT = 200
+ITERATIONS = 50
+
+
+def legacy_device_walk(base: OmniBase | MSPConfig, bow_id: int = -1) -> Iterable[OmniBase]:
+    """The recursive walker as it was before it was made iterative and cached, kept here as the benchmark baseline."""
+    for _key, value in base:
+        if isinstance(value, OmniBase) and hasattr(value, "system_id"):
+            device = value.without_subdevices()
+            if bow_id != -1 and getattr(device, "bow_id", -1) == -1:
+                device.bow_id = bow_id
+            yield device
+
+            child_bow_id = value.system_id if value.omni_type == OmniType.BOW else bow_id
+            yield from legacy_device_walk(value, child_bow_id)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, OmniBase) and hasattr(item, "system_id"):
+                    device = item.without_subdevices()
+                    if bow_id != -1 and getattr(device, "bow_id", -1) == -1:
+                        device.bow_id = bow_id
+                    yield device
+
+                    child_bow_id = item.system_id if item.omni_type == OmniType.BOW else bow_id
+                    yield from legacy_device_walk(item, child_bow_id)
+
+
+def run(device_count: int = DEVICE_COUNT, iterations: int = ITERATIONS) -> dict[str, object]:
+    mspconfig = build_mspconfig(device_count)
+
+    legacy = [(device.system_id, device.bow_id) for device in legacy_device_walk(mspconfig)]
+    current = [(device.system_id, device.bow_id) for device in device_walk(mspconfig)]
+    if legacy != current:
+        msg = "The legacy and current device walkers disagree"
+        raise AssertionError(msg)
+
+    def _per_call(stmt: Callable[[], object]) -> float:
+        return min(timeit.repeat(stmt, number=iterations, repeat=5)) / iterations
+
+    return {
+        "benchmark": "device_walk",
+        "devices": len(current),
+        "iterations": iterations,
+        "legacy_seconds": _per_call(lambda: list(legacy_device_walk(mspconfig))),
+        "uncached_seconds": _per_call(lambda: _device_walk(mspconfig, -1)),
+        "cached_seconds": _per_call(lambda: device_walk(mspconfig)),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,167 @@
+"""A minimal Home Assistant instance with the integration set up against a synthetic controller, for the benchmarks to drive."""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from itertools import cycle
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import EntityPlatform
+from pyomnilogic_local import OmniLogic
+
+from custom_components.omnilogic_local import binary_sensor, button, light, number, sensor, switch, water_heater
+from custom_components.omnilogic_local.const import DOMAIN, KEY_COORDINATOR
+from custom_components.omnilogic_local.coordinator import OmniLogicCoordinator
+
+from .synthetic import build_mspconfig_xml, build_telemetry_xml
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+    from types import ModuleType
+
+    from homeassistant.helpers.entity import Entity
+
+PLATFORMS: dict[str, ModuleType] = {
+    "binary_sensor": binary_sensor,
+    "button": button,
+    "light": light,
+    "number": number,
+    "sensor": sensor,
+    "switch": switch,
+    "water_heater": water_heater,
+}
+# How many different telemetry documents the synthetic controller cycles through, so consecutive polls see some churn
+TELEMETRY_VARIANTS = 8
+
+
+class SyntheticAPI:
+    """Stands in for the library's OmniLogicAPI, answering with pre-built synthetic documents instead of talking UDP."""
+
+    def __init__(self, device_count: int, changed_fraction: float = 0.1) -> None:
+        self.mspconfig = build_mspconfig_xml(device_count)
+        self._telemetry = cycle([build_telemetry_xml(device_count, seed, changed_fraction) for seed in range(TELEMETRY_VARIANTS)])
+
+    async def async_get_mspconfig(self, raw: bool = False) -> str:  # noqa: ARG002  # Matches the library's signature
+        return self.mspconfig
+
+    async def async_get_telemetry(self, raw: bool = False) -> str:  # noqa: ARG002  # Matches the library's signature
+        return next(self._telemetry)
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[None]]:
+        # Commands are accepted and ignored
+        async def _ignore(*args: Any, **kwargs: Any) -> None:
+            pass
+
+        return _ignore
+
+
+@asynccontextmanager
+async def async_create_hass() -> AsyncIterator[HomeAssistant]:
+    """A Home Assistant instance with just enough loaded to add entities to platforms."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = ConfigEntries(hass, {})
+        await hass.config_entries.async_initialize()
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+def create_config_entry() -> ConfigEntry:
+    """A config entry for the integration, built with the arguments the installed version of Home Assistant requires."""
+    kwargs: dict[str, Any] = {
+        "data": {},
+        "discovery_keys": MappingProxyType({}),
+        "domain": DOMAIN,
+        "minor_version": 1,
+        "options": {},
+        "source": "user",
+        "title": "benchmark",
+        "unique_id": None,
+        "version": 4,
+    }
+    # Home Assistant 2025.3 added config subentries, and requires them to be passed
+    if "subentries_data" in inspect.signature(ConfigEntry).parameters:
+        kwargs["subentries_data"] = None
+    return ConfigEntry(**kwargs)
+
+
+async def async_create_coordinator(
+    hass: HomeAssistant,
+    device_count: int,
+    scan_interval: int = 10,
+    poll_phase: float | None = None,
+    entry: ConfigEntry | None = None,
+    api: SyntheticAPI | None = None,
+) -> tuple[OmniLogicCoordinator, ConfigEntry]:
+    """Create a coordinator polling a synthetic controller, with its first refresh done and registered for the platforms.
+
+    Passing the entry and API of an earlier coordinator sets the same controller up again, as a reload of the config entry would.
+    """
+    if entry is None:
+        entry = create_config_entry()
+        # Known to the config entries without being set up through them, so the platforms can register entities for it
+        hass.config_entries._entries[entry.entry_id] = entry  # noqa: SLF001
+    omni = OmniLogic("127.0.0.1")
+    omni._api = api or SyntheticAPI(device_count)  # type: ignore[assignment]
+    coordinator = OmniLogicCoordinator(hass=hass, config_entry=entry, omni=omni, scan_interval=scan_interval, poll_phase=poll_phase)
+    await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {KEY_COORDINATOR: coordinator}
+    return coordinator, entry
+
+
+async def async_build_platform(hass: HomeAssistant, entry: ConfigEntry, domain: str) -> list[Entity]:
+    """Run a platform's async_setup_entry, returning the entities it would add."""
+    entities: list[Entity] = []
+    await PLATFORMS[domain].async_setup_entry(hass, entry, lambda new_entities, update_before_add=False: entities.extend(new_entities))  # noqa: ARG005
+    return entities
+
+
+async def async_add_to_platform(
+    hass: HomeAssistant, domain: str, entities: list[Entity], entry: ConfigEntry | None = None
+) -> EntityPlatform:
+    """Add entities to an entity platform so they write state and listen to the coordinator, as they would in Home Assistant.
+
+    With the entry, the entities are registered as belonging to it.
+    """
+    platform = _create_platform(hass, domain, entry)
+    await platform.async_add_entities(entities)
+    return platform
+
+
+async def async_set_up_platform(hass: HomeAssistant, entry: ConfigEntry, domain: str) -> EntityPlatform:
+    """Run a platform's async_setup_entry against an entity platform, which also gets any entities the platform adds later on."""
+    platform = _create_platform(hass, domain, entry)
+
+    def _async_add_entities(new_entities: Iterable[Entity], update_before_add: bool = False) -> None:
+        hass.async_create_task(platform.async_add_entities(new_entities, update_before_add))
+
+    await PLATFORMS[domain].async_setup_entry(hass, entry, _async_add_entities)
+    await hass.async_block_till_done()
+    return platform
+
+
+def _create_platform(hass: HomeAssistant, domain: str, entry: ConfigEntry | None) -> EntityPlatform:
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(f"{__name__}.{domain}"),
+        domain=domain,
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=10),
+        entity_namespace=None,
+    )
+    platform.config_entry = entry
+    return platform
@@ -0,0 +1,101 @@
+"""Compare the memory allocated per poll by rebuilding the entity index from dict-based records with re-binding slotted ones."""
+
+from __future__ import annotations
+
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from custom_components.omnilogic_local.const import OMNI_TO_HASS_TYPES
+from custom_components.omnilogic_local.models.entity_index import EntityIndex, EntityIndexData
+from custom_components.omnilogic_local.utils import device_walk, telemetry_by_system_id
+
+from .synthetic import build_mspconfig, build_telemetry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pyomnilogic_local.models.mspconfig import MSPConfig
+
+    from custom_components.omnilogic_local.models.entity_index import TelemetryTypes
+
+DEVICE_COUNT = 200
+POLLS = 20
+
+
+@dataclass
+class LegacyEntityIndexData:
+    """The index record as it was before it was slotted, kept here as the benchmark baseline."""
+
+    msp_config: Any
+    telemetry: Any
+
+
+def legacy_poll(mspconfig: MSPConfig, telemetry: dict[int, TelemetryTypes]) -> EntityIndex:
+    """Build a fresh index of dict-based records, as every poll used to."""
+    index = EntityIndex()
+    for device in device_walk(mspconfig):
+        index.add(LegacyEntityIndexData(device, telemetry.get(device.system_id)), OMNI_TO_HASS_TYPES.get(device.omni_type))  # type: ignore[arg-type]
+    return index
+
+
+def current_poll(index: EntityIndex, telemetry: dict[int, TelemetryTypes]) -> EntityIndex:
+    """Point the existing slotted records at the new telemetry, as the coordinator does between MSP config changes."""
+    for system_id, entity in index.items():
+        entity.telemetry = telemetry.get(system_id)
+    return index
+
+
+def _record_size(record: object) -> int:
+    return sys.getsizeof(record) + (sys.getsizeof(record.__dict__) if hasattr(record, "__dict__") else 0)
+
+
+def _allocated_per_poll(
+    poll: Callable[[dict[int, TelemetryTypes]], EntityIndex], snapshots: list[dict[int, TelemetryTypes]]
+) -> dict[str, float]:
+    """Bytes and blocks still held after polling through the snapshots, and the peak above where we started."""
+    retained: list[EntityIndex] = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for telemetry in snapshots:
+            # The previous index stays referenced until the next poll replaces it, as it does as the coordinator's data
+            retained[:] = [poll(telemetry)]
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return {
+        "retained_bytes": current - start,
+        "retained_blocks": sum(stat.count_diff for stat in after.compare_to(before, "filename")),
+        "peak_bytes": peak - start,
+    }
+
+
+def run(device_count: int = DEVICE_COUNT, polls: int = POLLS) -> dict[str, object]:
+    mspconfig = build_mspconfig(device_count)
+    snapshots = [telemetry_by_system_id(build_telemetry(device_count, seed)) for seed in range(polls)]
+
+    index = EntityIndex()
+    for device in device_walk(mspconfig):
+        index.add(EntityIndexData(device, snapshots[0].get(device.system_id)), OMNI_TO_HASS_TYPES.get(device.omni_type))
+    legacy_index = legacy_poll(mspconfig, snapshots[0])
+
+    return {
+        "benchmark": "index_memory",
+        "devices": len(index),
+        "polls": polls,
+        "legacy_record_bytes": _record_size(next(iter(legacy_index.values()))),
+        "current_record_bytes": _record_size(next(iter(index.values()))),
+        "legacy": _allocated_per_poll(lambda telemetry: legacy_poll(mspconfig, telemetry), snapshots),
+        "current": _allocated_per_poll(lambda telemetry: current_poll(index, telemetry), snapshots),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,67 @@
+"""Measure event loop lag while several controllers are polled, with their polls aligned and with them staggered."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import sys
+
+from .harness import async_create_coordinator, async_create_hass
+
+CONTROLLERS = 4
+DEVICE_COUNT = 300
+SCAN_INTERVAL = 2
+DURATION = 10.0
+# How often the probe asks to be woken up, its lateness is the lag anything else on the loop would see
+PROBE_INTERVAL = 0.005
+
+
+async def _async_probe(duration: float) -> list[float]:
+    loop = asyncio.get_running_loop()
+    lags: list[float] = []
+    end = loop.time() + duration
+    while (expected := loop.time() + PROBE_INTERVAL) < end:
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - expected)
+    return lags
+
+
+async def async_run_mode(staggered: bool, controllers: int = CONTROLLERS, duration: float = DURATION) -> dict[str, object]:
+    async with async_create_hass() as hass:
+        coordinators = [
+            (await async_create_coordinator(hass, DEVICE_COUNT, SCAN_INTERVAL, None if staggered else 0.0))[0] for _ in range(controllers)
+        ]
+        # Coordinators only schedule polls while something is listening to them
+        unsubscribes = [coordinator.async_add_listener(lambda: None) for coordinator in coordinators]
+        lags = await _async_probe(duration)
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+
+    lags.sort()
+    return {
+        "poll_phases": [round(coordinator.poll_phase, 3) for coordinator in coordinators],
+        "polls": sum(coordinator.poll_stats.polls for coordinator in coordinators),
+        "probe_lag_mean_seconds": statistics.fmean(lags),
+        "probe_lag_p99_seconds": lags[int(len(lags) * 0.99)],
+        "probe_lag_max_seconds": lags[-1],
+        "poll_loop_lag_max_seconds": max(coordinator.poll_stats.max_loop_lag for coordinator in coordinators),
+    }
+
+
+async def async_run() -> dict[str, object]:
+    return {
+        "benchmark": "poll_stagger",
+        "controllers": CONTROLLERS,
+        "devices": DEVICE_COUNT,
+        "scan_interval": SCAN_INTERVAL,
+        "aligned": await async_run_mode(staggered=False),
+        "staggered": await async_run_mode(staggered=True),
+    }
+
+
+if __name__ == "__main__":
+    json.dump(asyncio.run(async_run()), sys.stdout, indent=2)
+    sys.stdout.write("\n")
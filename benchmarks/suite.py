@@ -0,0 +1,142 @@
+"""Benchmark a coordinator refresh and the platform setup end to end, against synthetic controllers of several sizes.
+
+Run with `python -m benchmarks.suite --output results.json`, and later `python -m benchmarks.suite --compare results.json` to
+exit non-zero if anything has become slower than the threshold allows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+from functools import partial
+from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from . import device_walk
+from .harness import PLATFORMS, async_add_to_platform, async_build_platform, async_create_coordinator, async_create_hass
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from custom_components.omnilogic_local.coordinator import OmniLogicCoordinator
+
+DEVICE_COUNTS = (10, 100, 500)
+ITERATIONS = 20
+REPEATS = 5
+REGRESSION_THRESHOLD = 1.25
+
+
+async def _async_per_call(func: Callable[[], Awaitable[object] | object], iterations: int = ITERATIONS) -> float:
+    """The best mean seconds per call over REPEATS runs of iterations calls, awaiting the result if there is one."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if asyncio.iscoroutine(result := func()):
+                await result
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+
+async def _async_update_data_config_changed(coordinator: OmniLogicCoordinator) -> None:
+    # Forget the config fingerprint so the poll re-parses the MSP config and rebuilds the entity index, as after a config change
+    coordinator.config_fingerprint = None
+    await coordinator._async_update_data()
+    coordinator._pending_config_change = None
+
+
+async def async_run_size(device_count: int, iterations: int = ITERATIONS) -> dict[str, Any]:
+    """Benchmark the integration against a synthetic controller with roughly device_count devices."""
+    metrics: dict[str, float] = {}
+    walk = device_walk.run(device_count, iterations)
+    metrics["device_walk_uncached_seconds"] = walk["uncached_seconds"]  # type: ignore[assignment]
+    metrics["device_walk_cached_seconds"] = walk["cached_seconds"]  # type: ignore[assignment]
+
+    async with async_create_hass() as hass:
+        start = time.perf_counter()
+        coordinator, entry = await async_create_coordinator(hass, device_count)
+        metrics["first_refresh_seconds"] = time.perf_counter() - start
+
+        metrics["update_data_config_changed_seconds"] = await _async_per_call(
+            lambda: _async_update_data_config_changed(coordinator), iterations
+        )
+        metrics["update_data_seconds"] = await _async_per_call(coordinator._async_update_data, iterations)
+
+        entity_count = 0
+        for domain in PLATFORMS:
+            metrics[f"setup_{domain}_seconds"] = await _async_per_call(partial(async_build_platform, hass, entry, domain), 1)
+            entities = await async_build_platform(hass, entry, domain)
+            start = time.perf_counter()
+            await async_add_to_platform(hass, domain, entities)
+            metrics[f"add_{domain}_seconds"] = time.perf_counter() - start
+            entity_count += len(entities)
+
+        # Every entity writing its state, as after a config change or the backyard changing state
+        metrics["update_all_listeners_seconds"] = await _async_per_call(
+            lambda: DataUpdateCoordinator.async_update_listeners(coordinator), iterations
+        )
+        # A routine poll, where only the entities whose telemetry changed are updated
+        metrics["refresh_seconds"] = await _async_per_call(coordinator.async_refresh, iterations)
+        await coordinator.async_shutdown()
+
+    return {"devices": walk["devices"], "entities": entity_count, "metrics": metrics}
+
+
+def _metadata() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "pyomnilogic_local": version("python-omnilogic-local"),
+        "machine": platform.machine(),
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    """Return a description of every metric that is more than threshold times slower than in the baseline."""
+    baseline_runs = {run["devices"]: run["metrics"] for run in baseline["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        for name, seconds in run["metrics"].items():
+            before = baseline_runs.get(run["devices"], {}).get(name)
+            if before and seconds / before > threshold:
+                regressions.append(f"{name} with {run['devices']} devices: {before:.6f}s -> {seconds:.6f}s ({seconds / before:.2f}x)")
+    return regressions
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEVICE_COUNTS, help="synthetic controller sizes, in devices")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--output", type=Path, help="also write the results to this file")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="results of an earlier run to check for regressions against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="how many times slower counts as a regression")
+    return parser.parse_args()
+
+
+async def _async_main(args: argparse.Namespace) -> int:
+    results = {"metadata": _metadata(), "runs": [await async_run_size(size, args.iterations) for size in args.sizes]}
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        for regression in regressions:
+            sys.stderr.write(f"Regression: {regression}\n")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(_async_main(_parse_args())))
@@ -0,0 +1,124 @@
+"""Synthetic MSP config and telemetry payloads for benchmarking."""
+
+from __future__ import annotations
+
+import random
+from xml.sax.saxutils import escape
+
+from pyomnilogic_local.models.mspconfig import MSPConfig
+from pyomnilogic_local.models.telemetry import Telemetry
+
+BOW_COUNT = 2
+# Each body of water has a filter and a water temperature sensor, the rest of the devices are spread over these equipment types
+BOW_EQUIPMENT = ("Relay", "Pump", "ColorLogic-Light")
+
+
+def _element(tag: str, children: dict[str, object]) -> str:
+    body = "".join(f"<{key}>{escape(str(value))}</{key}>" for key, value in children.items())
+    return f"<{tag}>{body}</{tag}>"
+
+
+def _pump_speeds() -> dict[str, object]:
+    return {
+        "Max-Pump-Speed": 100,
+        "Min-Pump-Speed": 18,
+        "Max-Pump-RPM": 3450,
+        "Min-Pump-RPM": 600,
+        "Priming-Enabled": "yes",
+        "Vsp-Low-Pump-Speed": 40,
+        "Vsp-Medium-Pump-Speed": 60,
+        "Vsp-High-Pump-Speed": 80,
+    }
+
+
+def _layout(device_count: int) -> dict[int, list[tuple[str, int]]]:
+    """Assign system IDs to equipment, returns a mapping of bow system ID to its list of (equipment type, system ID)."""
+    next_id = 1
+    layout: dict[int, list[tuple[str, int]]] = {}
+    for _ in range(BOW_COUNT):
+        layout[next_id] = [("Filter", next_id + 1), ("Sensor", next_id + 2)]
+        next_id += 3
+    # The backyard, its air sensor and the bodies of water themselves count towards the total
+    remaining = max(device_count - 2 - len(layout) * 3, 0)
+    bow_ids = list(layout)
+    for index in range(remaining):
+        layout[bow_ids[index % len(bow_ids)]].append((BOW_EQUIPMENT[index % len(BOW_EQUIPMENT)], next_id))
+        next_id += 1
+    return layout
+
+
+def build_mspconfig_xml(device_count: int) -> str:
+    """Build an MSP config XML document with roughly device_count devices."""
+    layout = _layout(device_count)
+    air_sensor_id = max(system_id for devices in layout.values() for _, system_id in devices) + 1
+    bows = []
+    for bow_id, devices in layout.items():
+        equipment = []
+        for equip_type, system_id in devices:
+            base = {"System-Id": system_id, "Name": f"{equip_type} {system_id}"}
+            match equip_type:
+                case "Filter":
+                    equipment.append(_element("Filter", base | {"Filter-Type": "FMT_VARIABLE_SPEED_PUMP"} | _pump_speeds()))
+                case "Sensor":
+                    equipment.append(_element("Sensor", base | {"Type": "SENSOR_WATER_TEMP", "Units": "UNITS_FAHRENHEIT"}))
+                case "Relay":
+                    equipment.append(_element("Relay", base | {"Type": "RLY_HIGH_VOLTAGE_RELAY", "Function": "RLY_ACCESSORY"}))
+                case "Pump":
+                    equipment.append(
+                        _element("Pump", base | {"Type": "PMP_VARIABLE_SPEED_PUMP", "Function": "PMP_WATER_FEATURE"} | _pump_speeds())
+                    )
+                case "ColorLogic-Light":
+                    equipment.append(_element("ColorLogic-Light", base | {"Type": "COLOR_LOGIC_UCL"}))
+        bows.append(
+            f"<Body-of-water><System-Id>{bow_id}</System-Id><Name>Pool {bow_id}</Name><Type>BOW_POOL</Type>"
+            f"<Supports-Spillover>no</Supports-Spillover>{''.join(equipment)}</Body-of-water>"
+        )
+    air_sensor = _element(
+        "Sensor", {"System-Id": air_sensor_id, "Name": "Air Sensor", "Type": "SENSOR_AIR_TEMP", "Units": "UNITS_FAHRENHEIT"}
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" ?><MSPConfig>'
+        "<System><Msp-Vsp-Speed-Format>Percent</Msp-Vsp-Speed-Format><Units>Standard</Units></System>"
+        f"<Backyard><System-Id>0</System-Id><Name>Backyard</Name>{air_sensor}{''.join(bows)}</Backyard>"
+        "</MSPConfig>"
+    )
+
+
+def build_telemetry_xml(device_count: int, seed: int = 0, changed_fraction: float = 0.1) -> str:
+    """Build a telemetry XML document matching build_mspconfig_xml(device_count).
+
+    A different seed moves roughly changed_fraction of the devices to a different state, which mimics the churn between two polls.
+    """
+    rng = random.Random(seed)
+
+    def _changed() -> int:
+        return int(seed != 0 and rng.random() < changed_fraction)
+
+    elements = ['<Backyard systemId="0" statusVersion="11" airTemp="70" state="1" ConfigChksum="1" mspVersion="R0512" />']
+    for bow_id, devices in _layout(device_count).items():
+        elements.append(f'<BodyOfWater systemId="{bow_id}" waterTemp="{80 + _changed()}" flow="1" />')
+        for equip_type, system_id in devices:
+            match equip_type:
+                case "Filter":
+                    elements.append(
+                        f'<Filter systemId="{system_id}" filterState="1" filterSpeed="60" valvePosition="1" whyFilterIsOn="11" '
+                        f'reportedFilterSpeed="60" power="{900 + _changed()}" lastSpeed="60" />'
+                    )
+                case "Relay":
+                    elements.append(f'<Relay systemId="{system_id}" relayState="{_changed()}" whyOn="0" />')
+                case "Pump":
+                    elements.append(f'<Pump systemId="{system_id}" pumpState="{_changed()}" pumpSpeed="0" lastSpeed="60" whyOn="0" />')
+                case "ColorLogic-Light":
+                    elements.append(
+                        f'<ColorLogic-Light systemId="{system_id}" lightState="{6 * _changed()}" currentShow="0" speed="4" '
+                        'brightness="4" specialEffect="0" />'
+                    )
+    return f'<?xml version="1.0" encoding="UTF-8" ?><STATUS version="1.11">{"".join(elements)}</STATUS>'
+
+
+def build_mspconfig(device_count: int) -> MSPConfig:
+    return MSPConfig.load_xml(build_mspconfig_xml(device_count))
+
+
+def build_telemetry(device_count: int, seed: int = 0) -> Telemetry:
+    return Telemetry.load_xml(build_telemetry_xml(device_count, seed))
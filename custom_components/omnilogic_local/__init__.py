@@ -6,17 +6,34 @@ import logging
 from typing import TYPE_CHECKING
 
 from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, CONF_PORT, CONF_SCAN_INTERVAL, CONF_TIMEOUT, Platform
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from pyomnilogic_local import OmniLogic
 from pyomnilogic_local.omnitypes import OmniType
 
-from .const import BACKYARD_SYSTEM_ID, DEFAULT_SCAN_INTERVAL, DOMAIN, KEY_COORDINATOR
-from .coordinator import OmniLogicCoordinator
+from .const import (
+    CONF_COMMAND_REFRESH_DELAY,
+    CONF_CONFIG_SCAN_INTERVAL,
+    CONF_FAILURES_BEFORE_UNAVAILABLE,
+    CONF_POLL_PHASE,
+    CONF_TRACE,
+    DEFAULT_CONFIG_SCAN_INTERVAL,
+    DEFAULT_FAILURES_BEFORE_UNAVAILABLE,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    KEY_COORDINATOR,
+    UPDATE_DELAY_SECONDS,
+)
+from .coordinator import OmniLogicCoordinator, async_get_cache_store
+from .services import async_setup_services
+from .utils import backyard_identifier, bow_identifier
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
 PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -30,21 +47,38 @@ PLATFORMS: list[Platform] = [
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:  # noqa: ARG001
+    """Set up the OmniLogic Local services, they are shared by every config entry."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up OmniLogic Local from a config entry."""
     # Create an API instance
     omni = OmniLogic(entry.data[CONF_IP_ADDRESS], entry.data[CONF_PORT], entry.data[CONF_TIMEOUT])
 
-    # Validate that we can talk to the API endpoint
-    try:
-        await omni.refresh()
-    except Exception as error:
-        raise ConfigEntryNotReady from error
-
     # Create our data coordinator
-    coordinator = OmniLogicCoordinator(hass=hass, omni=omni, scan_interval=entry.data[CONF_SCAN_INTERVAL])
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = OmniLogicCoordinator(
+        hass=hass,
+        config_entry=entry,
+        omni=omni,
+        scan_interval=entry.data[CONF_SCAN_INTERVAL],
+        command_refresh_delay=entry.data.get(CONF_COMMAND_REFRESH_DELAY, UPDATE_DELAY_SECONDS),
+        trace=entry.data.get(CONF_TRACE, False),
+        poll_phase=entry.data[CONF_POLL_PHASE] / 100 if entry.data.get(CONF_POLL_PHASE) is not None else None,
+        config_scan_interval=entry.data.get(CONF_CONFIG_SCAN_INTERVAL, DEFAULT_CONFIG_SCAN_INTERVAL),
+        failures_before_unavailable=entry.data.get(CONF_FAILURES_BEFORE_UNAVAILABLE, DEFAULT_FAILURES_BEFORE_UNAVAILABLE),
+    )
+    if await coordinator.async_load_cache():
+        # Set up from what the controller last told us, and catch up with it in the background
+        entry.async_create_background_task(hass, coordinator.async_refresh(), name=f"{coordinator.name} - first refresh")
+    else:
+        # Validate that we can talk to the API endpoint
+        await coordinator.async_config_entry_first_refresh()
 
     device_registry = dr.async_get(hass)
 
@@ -52,7 +86,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug("Creating device for backyard: %s", omni.backyard)
     device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
-        identifiers={(DOMAIN, f"backyard_{BACKYARD_SYSTEM_ID}")},
+        identifiers={backyard_identifier(entry.entry_id)},
         manufacturer="Hayward",
         suggested_area="Back Yard",
         name=f"{entry.data[CONF_NAME]} {omni.backyard.name}",
@@ -60,10 +94,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Create a device for each Body of Water
     for bow in omni.backyard.bow:
+        if bow.system_id is None:
+            # Without a system ID it cannot be told apart from the other bodies of water
+            continue
         _LOGGER.debug("Creating device for BOW: %s", bow)
         device_registry.async_get_or_create(
             config_entry_id=entry.entry_id,
-            identifiers={(DOMAIN, f"bow_{bow.system_id}")},
+            identifiers={bow_identifier(entry.entry_id, bow.system_id)},
             manufacturer="Hayward",
             suggested_area="Back Yard",
             name=f"{entry.data[CONF_NAME]} {bow.name}",
@@ -89,6 +126,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached MSP config and telemetry of a deleted config entry."""
+    await async_get_cache_store(hass, entry.entry_id).async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -140,6 +182,29 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
 
         hass.config_entries.async_update_entry(config_entry, version=3)
 
+    if config_entry.version == 3:
+        # Make device identifiers and entity unique IDs unique per controller, so that several controllers can be configured
+        device_registry = dr.async_get(hass)
+        for device in dr.async_entries_for_config_entry(device_registry, config_entry.entry_id):
+            new_identifiers = {
+                (domain, f"{config_entry.entry_id}_{value}")
+                if domain == DOMAIN and value.startswith(("backyard_", "bow_"))
+                else (domain, value)
+                for domain, value in device.identifiers
+            }
+            if new_identifiers != device.identifiers:
+                _LOGGER.debug("Migrating device %s identifiers from %s to %s", device.id, device.identifiers, new_identifiers)
+                device_registry.async_update_device(device.id, new_identifiers=new_identifiers)
+
+        @callback
+        def _migrate_unique_id(entity_entry: er.RegistryEntry) -> dict[str, str] | None:
+            if entity_entry.unique_id.startswith(f"{config_entry.entry_id} "):
+                return None
+            return {"new_unique_id": f"{config_entry.entry_id} {entity_entry.unique_id}"}
+
+        await er.async_migrate_entries(hass, config_entry.entry_id, _migrate_unique_id)
+        hass.config_entries.async_update_entry(config_entry, version=4)
+
     _LOGGER.info("Migration to version %s successful", config_entry.version)
 
     return True
@@ -4,11 +4,12 @@ import logging
 from typing import TYPE_CHECKING
 
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.const import Platform
 from pyomnilogic_local import Backyard, Bow, HeaterEquipment
 
 from .const import DOMAIN, KEY_COORDINATOR
 from .coordinator import OmniLogicCoordinator
-from .entity import OmniLogicEntity
+from .entity import OmniLogicEntity, PublishPolicy, async_setup_entities
 from .models.entity_index import EntityIndexBackyard, EntityIndexBodyOfWater, EntityIndexHeaterEquip
 
 if TYPE_CHECKING:
@@ -23,11 +24,16 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the switch platform."""
     coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.BINARY_SENSOR)
+
+
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[BinarySensorEntity]:
+    """Build the binary sensor entities for the devices in the coordinator data."""
     entities: list[BinarySensorEntity] = []
     _LOGGER.debug("Setting up binary_sensor platform")
 
     # Create a binary sensor entity indicating if we are in Service Mode
-    entities.append(OmniLogicServiceModeBinarySensorEntity(coordinator=coordinator, equipment=coordinator.omni.backyard))
+    entities.append(OmniLogicServiceModeBinarySensorEntity(coordinator=coordinator, context=coordinator.omni.backyard))
 
     # Create binary sensor entities for each piece of Heater-Equipment
 
@@ -35,7 +41,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         entities.append(
             OmniLogicHeaterEquipBinarySensorEntity(
                 coordinator=coordinator,
-                equipment=heater_equipment,
+                context=heater_equipment,
             )
         )
 
@@ -44,12 +50,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         entities.append(
             OmniLogicFlowBinarySensorEntity(
                 coordinator=coordinator,
-                equipment=bow,
+                context=bow,
             )
         )
 
     _LOGGER.debug("Adding %s binary_sensor entities", len(entities))
-    async_add_entities(entities)
+    return entities
 
 
 class OmniLogicServiceModeBinarySensorEntity(OmniLogicEntity[Backyard, EntityIndexBackyard], BinarySensorEntity):
@@ -58,7 +64,7 @@ class OmniLogicServiceModeBinarySensorEntity(OmniLogicEntity[Backyard, EntityInd
     @property
     def available(self) -> bool:
         # This is one of the few things we can pull from the telemetry even if we are in service mode
-        if self.equipment.telemetry is None:
+        if self.coordinator.telemetry_expired or self.equipment.telemetry is None:
             return False
         return True
 
@@ -73,13 +79,13 @@ class OmniLogicHeaterEquipBinarySensorEntity(OmniLogicEntity[HeaterEquipment, En
     """Expose a binary state via a sensor based on telemetry data."""
 
     device_class = BinarySensorDeviceClass.HEAT
+    _unique_id_suffix = "Status"
 
     @property
     def icon(self) -> str | None:
         return "mdi:water-boiler" if self.is_on else "mdi:water-boiler-off"
 
-    @property
-    def name(self) -> str:
+    def _build_name(self) -> str:
         return f"{self.equipment.name} Status"
 
     @property
@@ -92,12 +98,15 @@ class OmniLogicHeaterEquipBinarySensorEntity(OmniLogicEntity[HeaterEquipment, En
 class OmniLogicFlowBinarySensorEntity(OmniLogicEntity[Bow, EntityIndexBodyOfWater], BinarySensorEntity):
     """Expose a binary state via a sensor based on telemetry data."""
 
+    # The flow switch flaps when the flow is marginal, so a change of flow has to hold for a while before it is shown
+    _publish_policy = PublishPolicy(hold=30)
+    _unique_id_suffix = "Status"
+
     @property
     def icon(self) -> str | None:
         return "mdi:water-check" if self.is_on else "mdi:water-remove"
 
-    @property
-    def name(self) -> str:
+    def _build_name(self) -> str:
         return f"{self.equipment.name} Status"
 
     @property
@@ -4,12 +4,12 @@ import logging
 from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.helpers.event import async_call_later
+from homeassistant.const import Platform
 from pyomnilogic_local import Backyard, Filter, Pump
 from pyomnilogic_local.omnitypes import FilterSpeedPresets, FilterType, PumpSpeedPresets, PumpType
 
-from .const import DOMAIN, KEY_COORDINATOR, UPDATE_DELAY_SECONDS
-from .entity import OmniLogicEntity
+from .const import DOMAIN, KEY_COORDINATOR
+from .entity import OmniLogicEntity, async_setup_entities
 from .models.entity_index import EntityIndexBackyard, EntityIndexFilter, EntityIndexPump
 
 if TYPE_CHECKING:
@@ -25,6 +25,11 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the switch platform."""
     coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.BUTTON)
+
+
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[ButtonEntity]:
+    """Build the button entities for the devices in the coordinator data."""
     entities: list[ButtonEntity] = []
 
     all_variable_pumps = [pump for pump in coordinator.omni.all_pumps if pump.mspconfig.equip_type == PumpType.VARIABLE_SPEED]
@@ -41,10 +46,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
 
     entities.append(OmniLogicIdleButtonEntity(coordinator=coordinator, equipment=coordinator.omni.backyard))
 
-    async_add_entities(entities)
+    return entities
 
 
 PumpTypeT = TypeVar("PumpTypeT", bound=Pump | Filter)
+# Keyed on the preset name, which pumps and filters share
+SPEED_PRESET_ICONS: dict[str, str] = {
+    "LOW": "mdi:speedometer-slow",
+    "MEDIUM": "mdi:speedometer-medium",
+    "HIGH": "mdi:speedometer",
+}
 SpeedPresetT = TypeVar("SpeedPresetT", bound=PumpSpeedPresets | FilterSpeedPresets)
 
 
@@ -62,58 +73,50 @@ class OmniLogicSpeedPresetButtonEntity(OmniLogicEntity[PumpTypeT, Any], ButtonEn
     def __init__(self, coordinator: OmniLogicCoordinator, equipment: PumpTypeT, speed: FilterSpeedPresets | PumpSpeedPresets) -> None:
         super().__init__(coordinator, equipment)
         self.speed = speed
+        self._attr_icon = SPEED_PRESET_ICONS[speed.name]
+        self._unique_id_suffix = f"{speed.name.capitalize()} Speed"
+
+    def _build_name(self) -> str:
+        return f"{self.equipment.name} {self.speed.name.capitalize()} Speed"
 
     @property
-    def icon(self) -> str:
+    def preset_speed(self) -> int:
+        """The speed percentage this button's preset runs the pump at."""
         match self.speed:
             case PumpSpeedPresets.LOW | FilterSpeedPresets.LOW:
-                return "mdi:speedometer-slow"
+                return self.equipment.low_speed
             case PumpSpeedPresets.MEDIUM | FilterSpeedPresets.MEDIUM:
-                return "mdi:speedometer-medium"
+                return self.equipment.medium_speed
             case PumpSpeedPresets.HIGH | FilterSpeedPresets.HIGH:
-                return "mdi:speedometer"
-
-    @property
-    def name(self) -> str:
-        return f"{self.equipment.name} {self.speed.name.capitalize()} Speed"
+                return self.equipment.high_speed
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        attrs = super().extra_state_attributes
-        match self.speed:
-            case PumpSpeedPresets.LOW | FilterSpeedPresets.LOW:
-                attrs["speed"] = self.equipment.low_speed
-            case PumpSpeedPresets.MEDIUM | FilterSpeedPresets.MEDIUM:
-                attrs["speed"] = self.equipment.medium_speed
-            case PumpSpeedPresets.HIGH | FilterSpeedPresets.HIGH:
-                attrs["speed"] = self.equipment.high_speed
-        return attrs
+        return super().extra_state_attributes | {"speed": self.preset_speed}
+
+    async def async_press(self) -> None:
+        # Sent through the command queue like the pump's other commands, rather than the library's run_preset_speed
+        await self.coordinator.omni_api.async_set_equipment(self.bow_id, self.system_id, self.preset_speed)
+        self.coordinator.async_refresh_after_command()
 
 
 class OmniLogicPumpButtonEntity(OmniLogicSpeedPresetButtonEntity[Pump], OmniLogicEntity[Pump, EntityIndexPump]):
     speed: PumpSpeedPresets
 
-    async def async_press(self) -> None:
-        await self.equipment.run_preset_speed(self.speed)
-        async_call_later(self.hass, UPDATE_DELAY_SECONDS, self._schedule_refresh_callback)
-
 
 class OmniLogicFilterButtonEntity(OmniLogicSpeedPresetButtonEntity[Filter], OmniLogicEntity[Filter, EntityIndexFilter]):
     speed: FilterSpeedPresets
 
-    async def async_press(self) -> None:
-        await self.equipment.run_preset_speed(self.speed)
-        async_call_later(self.hass, UPDATE_DELAY_SECONDS, self._schedule_refresh_callback)
-
 
 class OmniLogicIdleButtonEntity(OmniLogicEntity[Backyard, EntityIndexBackyard], ButtonEntity):
+    _unique_id_suffix = "Restore Idle"
+
     def __init__(self, coordinator: OmniLogicCoordinator, equipment: Backyard) -> None:
         super().__init__(coordinator, equipment)
 
-    @property
-    def name(self) -> str:
+    def _build_name(self) -> str:
         return "Restore Idle"
 
     async def async_press(self) -> None:
-        await self.coordinator.omni._api.async_restore_idle_state()
-        async_call_later(self.hass, UPDATE_DELAY_SECONDS, self._schedule_refresh_callback)
+        await self.coordinator.omni_api.async_restore_idle_state()
+        self.coordinator.async_refresh_after_command()
@@ -0,0 +1,137 @@
+"""A queue for the commands we send to the OmniLogic controller."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from .const import BACKYARD_SYSTEM_ID, COMMAND_CONCURRENCY
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from pyomnilogic_local.api import OmniLogicAPI
+    from pyomnilogic_local.omnitypes import LightShows
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class CommandStats:
+    """Counters and latencies for one kind of command."""
+
+    sent: int = 0
+    merged: int = 0
+    failed: int = 0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.sent if self.sent else 0.0
+
+
+@dataclass
+class _PendingCommand:
+    send: Callable[[], Awaitable[None]]
+    queued_at: float
+    future: asyncio.Future[None] = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class OmniLogicCommandQueue:
+    """Send commands to the controller with bounded concurrency.
+
+    The controller handles commands one at a time and drops some of them when they arrive in a burst, so we only allow a few
+    in flight at once. A command that is still waiting for its turn is replaced by any newer command of the same kind for the
+    same system ID, the callers of both are resolved once the newest one has been sent.
+    """
+
+    def __init__(self, api: OmniLogicAPI, request_limiter: asyncio.Semaphore, concurrency: int = COMMAND_CONCURRENCY) -> None:
+        self._api = api
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Shared with the polls and commands of every other configured controller
+        self._request_limiter = request_limiter
+        self._pending: dict[tuple[str, int], _PendingCommand] = {}
+        self.stats: dict[str, CommandStats] = {}
+
+    async def async_send(self, kind: str, system_id: int, send: Callable[[], Awaitable[None]]) -> None:
+        """Queue a command, merging it into a waiting command of the same kind for the same system ID."""
+        stats = self.stats.setdefault(kind, CommandStats())
+        key = (kind, system_id)
+        if (pending := self._pending.get(key)) is not None:
+            _LOGGER.debug("merging %s command for system ID %s into the one already queued", kind, system_id)
+            pending.send = send
+            stats.merged += 1
+            await asyncio.shield(pending.future)
+            return
+
+        pending = self._pending[key] = _PendingCommand(send, time.monotonic())
+        # Merged callers retrieve the outcome themselves, this keeps asyncio from warning about it when there were none
+        pending.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        started_at = pending.queued_at
+        try:
+            async with self._semaphore, self._request_limiter:
+                # Anything sent for this key from now on must go out after us, so it starts a new command
+                del self._pending[key]
+                started_at = time.monotonic()
+                await pending.send()
+        except asyncio.CancelledError:
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            pending.future.cancel()
+            raise
+        except Exception as exc:
+            stats.failed += 1
+            pending.future.set_exception(exc)
+            raise
+        else:
+            pending.future.set_result(None)
+            # Only commands the controller accepted count as sent, and towards the latencies
+            latency = time.monotonic() - pending.queued_at
+            stats.sent += 1
+            stats.last_latency = latency
+            stats.max_latency = max(stats.max_latency, latency)
+            stats.total_latency += latency
+            _LOGGER.debug(
+                "%s command for system ID %s took %.3fs, %.3fs of it queued", kind, system_id, latency, started_at - pending.queued_at
+            )
+
+    async def async_set_equipment(self, pool_id: int, equipment_id: int, is_on: int | bool | str, **kwargs: Any) -> None:
+        await self.async_send("set_equipment", equipment_id, partial(self._api.async_set_equipment, pool_id, equipment_id, is_on, **kwargs))
+
+    async def async_set_heater(self, pool_id: int, equipment_id: int, temperature: int, **kwargs: Any) -> None:
+        await self.async_send("set_heater", equipment_id, partial(self._api.async_set_heater, pool_id, equipment_id, temperature, **kwargs))
+
+    async def async_set_solar_heater(self, pool_id: int, equipment_id: int, temperature: int, **kwargs: Any) -> None:
+        await self.async_send(
+            "set_solar_heater", equipment_id, partial(self._api.async_set_solar_heater, pool_id, equipment_id, temperature, **kwargs)
+        )
+
+    async def async_set_heater_enable(self, pool_id: int, equipment_id: int, enabled: int | bool) -> None:
+        await self.async_send("set_heater_enable", equipment_id, partial(self._api.async_set_heater_enable, pool_id, equipment_id, enabled))
+
+    async def async_set_chlorinator_enable(self, pool_id: int, enabled: int | bool) -> None:
+        await self.async_send("set_chlorinator_enable", pool_id, partial(self._api.async_set_chlorinator_enable, pool_id, enabled))
+
+    async def async_set_chlorinator_params(self, pool_id: int, equipment_id: int, **kwargs: Any) -> None:
+        await self.async_send(
+            "set_chlorinator_params",
+            equipment_id,
+            partial(self._api.async_set_chlorinator_params, pool_id=pool_id, equipment_id=equipment_id, **kwargs),
+        )
+
+    async def async_set_light_show(self, pool_id: int, equipment_id: int, show: LightShows, **kwargs: Any) -> None:
+        await self.async_send(
+            "set_light_show", equipment_id, partial(self._api.async_set_light_show, pool_id, equipment_id, show, **kwargs)
+        )
+
+    async def async_set_spillover(self, pool_id: int, speed: int, **kwargs: Any) -> None:
+        await self.async_send("set_spillover", pool_id, partial(self._api.async_set_spillover, pool_id, speed, **kwargs))
+
+    async def async_restore_idle_state(self) -> None:
+        await self.async_send("restore_idle_state", BACKYARD_SYSTEM_ID, self._api.async_restore_idle_state)
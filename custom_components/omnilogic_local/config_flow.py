@@ -13,7 +13,20 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from pyomnilogic_local import OmniLogic
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN, MIN_SCAN_INTERVAL
+from .const import (
+    CONF_COMMAND_REFRESH_DELAY,
+    CONF_CONFIG_SCAN_INTERVAL,
+    CONF_FAILURES_BEFORE_UNAVAILABLE,
+    CONF_POLL_PHASE,
+    CONF_TRACE,
+    DEFAULT_CONFIG_SCAN_INTERVAL,
+    DEFAULT_FAILURES_BEFORE_UNAVAILABLE,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MIN_CONFIG_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    UPDATE_DELAY_SECONDS,
+)
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry, ConfigFlowResult
@@ -72,9 +85,26 @@ class OptionsFlowHandler(OptionsFlow):
                         msg="foo",
                         default=self.config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
                     ): vol.All(cv.positive_int, vol.Clamp(min=MIN_SCAN_INTERVAL)),
+                    vol.Optional(
+                        CONF_CONFIG_SCAN_INTERVAL,
+                        default=self.config_entry.data.get(CONF_CONFIG_SCAN_INTERVAL, DEFAULT_CONFIG_SCAN_INTERVAL),
+                    ): vol.All(cv.positive_int, vol.Clamp(min=MIN_CONFIG_SCAN_INTERVAL)),
                     vol.Required(CONF_TIMEOUT, default=self.config_entry.data[CONF_TIMEOUT]): vol.All(
                         vol.Coerce(float), vol.Range(min=0.5, max=10.0)
                     ),
+                    vol.Optional(
+                        CONF_COMMAND_REFRESH_DELAY,
+                        default=self.config_entry.data.get(CONF_COMMAND_REFRESH_DELAY, UPDATE_DELAY_SECONDS),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=10.0)),
+                    vol.Optional(
+                        CONF_FAILURES_BEFORE_UNAVAILABLE,
+                        default=self.config_entry.data.get(CONF_FAILURES_BEFORE_UNAVAILABLE, DEFAULT_FAILURES_BEFORE_UNAVAILABLE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                    # Left empty, the poll phase is picked automatically
+                    vol.Optional(CONF_POLL_PHASE, description={"suggested_value": self.config_entry.data.get(CONF_POLL_PHASE)}): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=99)
+                    ),
+                    vol.Optional(CONF_TRACE, default=self.config_entry.data.get(CONF_TRACE, False)): cv.boolean,
                 }
             ),
         )
@@ -83,7 +113,7 @@ class OptionsFlowHandler(OptionsFlow):
 class OmnilogicConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for OmniLogic Local."""
 
-    VERSION = 3
+    VERSION = 4
 
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle the initial step."""
@@ -7,10 +7,61 @@ from pyomnilogic_local.omnitypes import OmniType
 DOMAIN: Final[str] = "omnilogic_local"
 KEY_COORDINATOR: Final[str] = "coordinator"
 
+# Fired on the event bus, and sent to the dispatcher (formatted with the config entry ID), when the controller's MSP config changes
+EVENT_CONFIG_CHANGED: Final[str] = f"{DOMAIN}_config_changed"
+SIGNAL_CONFIG_CHANGED: Final[str] = f"{DOMAIN}_{{}}_config_changed"
+
 DEFAULT_SCAN_INTERVAL: Final[int] = 10
 MIN_SCAN_INTERVAL: Final[int] = 5
+# The MSP config is polled separately from the telemetry, and much less often, as it only changes when the pool is reconfigured
+CONF_CONFIG_SCAN_INTERVAL: Final[str] = "config_scan_interval"
+DEFAULT_CONFIG_SCAN_INTERVAL: Final[int] = 600
+MIN_CONFIG_SCAN_INTERVAL: Final[int] = 60
+# The last MSP config and telemetry we received are kept in this store (formatted with the config entry ID), so that entities can be
+# set up from it on startup without waiting for the controller. It is written this long after the MSP config changes, and otherwise
+# only every few hours and when the config entry is unloaded or Home Assistant stops, as it is only read at startup.
+CACHE_STORAGE_KEY: Final[str] = f"{DOMAIN}.{{}}"
+CACHE_STORAGE_VERSION: Final[int] = 1
+CACHE_SAVE_DELAY_SECONDS: Final[int] = 60
+CACHE_TELEMETRY_SAVE_DELAY_SECONDS: Final[int] = 3 * 60 * 60
+# Diagnostics include this many of the last telemetry documents received, kept compressed in memory
+DIAGNOSTICS_TELEMETRY_SNAPSHOTS: Final[int] = 5
+# The coordinator listener context of the poll statistics sensors, which are updated after every poll once it has been timed
+POLL_STATS_CONTEXT: Final[str] = "poll_stats"
+# Filter energy is only accumulated across gaps between polls up to this long, we do not know what the filters drew across longer ones
+ENERGY_MAX_SAMPLE_GAP_SECONDS: Final[int] = 900
 UPDATE_DELAY_SECONDS: Final[float] = 1.5
 
+# How many polls in a row may fail before entities go unavailable, until then they keep showing the last telemetry we received
+CONF_FAILURES_BEFORE_UNAVAILABLE: Final[str] = "failures_before_unavailable"
+DEFAULT_FAILURES_BEFORE_UNAVAILABLE: Final[int] = 3
+
+# How long to wait after a command before refreshing, every command sent within that window shares the one refresh
+CONF_COMMAND_REFRESH_DELAY: Final[str] = "command_refresh_delay"
+# Log a trace of every state read and entity update at debug level, this is very verbose and costs time on every state write
+CONF_TRACE: Final[str] = "trace_logging"
+# How long an optimistic state set after a command is shown for before we give up waiting for the controller to report it
+OPTIMISTIC_STATE_TTL_SECONDS: Final[int] = 30
+# A command for a light that is changing state is held until the light is ready for it, or dropped after this long
+LIGHT_READY_TIMEOUT_SECONDS: Final[int] = 120
+# How many commands we allow in flight to the controller at once, it handles them serially and drops some when they arrive in a burst
+COMMAND_CONCURRENCY: Final[int] = 1
+# How many requests we allow in flight across all configured controllers, so several controllers' polls are spread out rather than
+# all hitting the network at once. An unreachable controller holds a slot until it times out, so this is more than one.
+REQUEST_CONCURRENCY: Final[int] = 2
+KEY_REQUEST_LIMITER: Final[str] = "request_limiter"
+# Where in each polling interval a controller is polled, as a percentage of the interval. Controllers without one configured are
+# spread out automatically so that several controllers do not all poll in the same tick of the event loop.
+CONF_POLL_PHASE: Final[str] = "poll_phase"
+KEY_POLL_PHASES: Final[str] = "poll_phases"
+
+# Adaptive polling, we poll quickly for a while after a command or while a light is transitioning, and back off towards the
+# maximum interval once the telemetry has stopped changing or the backyard is in service mode
+FAST_SCAN_INTERVAL: Final[int] = 2
+FAST_POLL_WINDOW_SECONDS: Final[int] = 30
+IDLE_POLLS_BEFORE_BACKOFF: Final[int] = 6
+MAX_SCAN_INTERVAL: Final[int] = 120
+
 # According to Hayward docs, the backyard always has a system id of 0
 BACKYARD_SYSTEM_ID: Final[int] = 0
 
@@ -2,59 +2,724 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, cast
 
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from pyomnilogic_local.api.exceptions import OmniTimeoutError
+from pyomnilogic_local.models.mspconfig import MSPConfig
+from pyomnilogic_local.models.telemetry import Telemetry, TelemetryFilter
+from pyomnilogic_local.omnitypes import BackyardState, ColorLogicPowerState, OmniType
 
-from .utils import device_walk
+from .command_queue import OmniLogicCommandQueue
+from .const import (
+    BACKYARD_SYSTEM_ID,
+    CACHE_SAVE_DELAY_SECONDS,
+    CACHE_STORAGE_KEY,
+    CACHE_STORAGE_VERSION,
+    CACHE_TELEMETRY_SAVE_DELAY_SECONDS,
+    DEFAULT_CONFIG_SCAN_INTERVAL,
+    DEFAULT_FAILURES_BEFORE_UNAVAILABLE,
+    DIAGNOSTICS_TELEMETRY_SNAPSHOTS,
+    DOMAIN,
+    EVENT_CONFIG_CHANGED,
+    FAST_POLL_WINDOW_SECONDS,
+    FAST_SCAN_INTERVAL,
+    IDLE_POLLS_BEFORE_BACKOFF,
+    KEY_POLL_PHASES,
+    KEY_REQUEST_LIMITER,
+    MAX_SCAN_INTERVAL,
+    OMNI_TO_HASS_TYPES,
+    POLL_STATS_CONTEXT,
+    REQUEST_CONCURRENCY,
+    SIGNAL_CONFIG_CHANGED,
+    UPDATE_DELAY_SECONDS,
+)
+from .energy import EnergyAccumulator, filter_power
+from .errors import OmniLogicError
+from .models.entity_index import EntityIndex, EntityIndexData
+from .utils import device_walk, telemetry_by_system_id
 
 if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
-    from pyomnilogic_local import OmniLogic
+    from pyomnilogic_local import ColorLogicLight, OmniLogic
 
-    from .models.entity_index import EntityIndexT
+    from .models.entity_index import TelemetryTypes
 
+_LOGGER = logging.getLogger(__name__)
 
-# Import diagnostic data to reproduce issues
-SIMULATION = False
-if SIMULATION:
-    # This line is only used during development when simulating a pool with diagnostic data
-    # Disable the pylint and mypy alerts that don't like it when this variable isn't defined
-    pass
+# Successive multiples of this, modulo 1, are spread evenly over [0, 1) however many of them are taken
+GOLDEN_RATIO_CONJUGATE = 0.6180339887498949
 
-_LOGGER = logging.getLogger(__name__)
+FAST_UPDATE_INTERVAL = timedelta(seconds=FAST_SCAN_INTERVAL)
+MAX_UPDATE_INTERVAL = timedelta(seconds=MAX_SCAN_INTERVAL)
+SERVICE_BACKYARD_STATES = frozenset({BackyardState.SERVICE_MODE, BackyardState.CONFIG_MODE, BackyardState.TIMED_SERVICE_MODE})
+TRANSITIONAL_LIGHT_STATES = frozenset(
+    {
+        ColorLogicPowerState.POWERING_OFF,
+        ColorLogicPowerState.CHANGING_SHOW,
+        ColorLogicPowerState.FIFTEEN_SECONDS_WHITE,
+        ColorLogicPowerState.COOLDOWN,
+    }
+)
+
+
+@callback
+def async_get_request_limiter(hass: HomeAssistant) -> asyncio.Semaphore:
+    """The limiter shared by every configured controller that bounds how many requests are in flight across all of them."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if KEY_REQUEST_LIMITER not in domain_data:
+        domain_data[KEY_REQUEST_LIMITER] = asyncio.Semaphore(REQUEST_CONCURRENCY)
+    return cast("asyncio.Semaphore", domain_data[KEY_REQUEST_LIMITER])
+
+
+@callback
+def _async_next_poll_phase(hass: HomeAssistant) -> float:
+    """Pick a poll phase for a coordinator that does not have one configured, spread out from those picked before it."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    index: int = domain_data.get(KEY_POLL_PHASES, -1) + 1
+    domain_data[KEY_POLL_PHASES] = index
+    return (index * GOLDEN_RATIO_CONJUGATE) % 1
+
+
+def async_get_cache_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """The store holding the last MSP config and telemetry received from the controller of a config entry."""
+    return Store(hass, CACHE_STORAGE_VERSION, CACHE_STORAGE_KEY.format(entry_id))
+
+
+@dataclass(frozen=True, slots=True)
+class PayloadSnapshot:
+    """A raw document received from the controller, kept zlib compressed, with when it was fetched and how long that took."""
+
+    compressed: bytes
+    # None when the document was restored from the cache store rather than fetched since startup
+    fetched_at: datetime | None = None
+    network: float | None = None
+    parse: float | None = None
+
+    @classmethod
+    def from_payload(
+        cls, payload: str, fetched_at: datetime | None = None, network: float | None = None, parse: float | None = None
+    ) -> PayloadSnapshot:
+        return cls(zlib.compress(payload.encode(), 1), fetched_at, network, parse)
+
+    @property
+    def payload(self) -> str:
+        return zlib.decompress(self.compressed).decode()
+
+    def as_dict(self) -> dict[str, Any]:
+        """The metadata of the snapshot, without its payload."""
+        return {
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "network": self.network,
+            "parse": self.parse,
+            "compressed_size": len(self.compressed),
+        }
+
+
+@dataclass
+class PollStats:
+    """Timings of the last poll of the controller, and counters of how polling has gone since startup."""
+
+    polls: int = 0
+    config_fetches: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    last_success: datetime | None = None
+    last_error: str | None = None
+    # Seconds spent waiting on the controller, parsing its XML, building or re-binding the entity index and updating entities
+    last_duration: float | None = None
+    last_network: float | None = None
+    last_parse: float | None = None
+    last_index: float | None = None
+    last_fanout: float | None = None
+    # How late the event loop ran the last scheduled poll, and the worst it has been
+    last_loop_lag: float | None = None
+    max_loop_lag: float = 0.0
 
 
-class OmniLogicCoordinator(DataUpdateCoordinator["EntityIndexT"]):
+class OmniLogicCoordinator(DataUpdateCoordinator["EntityIndex"]):
     """Hayward OmniLogic API coordinator."""
 
     omni: OmniLogic
+    config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, omni: OmniLogic, scan_interval: int) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        omni: OmniLogic,
+        scan_interval: int,
+        command_refresh_delay: float = UPDATE_DELAY_SECONDS,
+        trace: bool = False,
+        poll_phase: float | None = None,
+        config_scan_interval: int = DEFAULT_CONFIG_SCAN_INTERVAL,
+        failures_before_unavailable: int = DEFAULT_FAILURES_BEFORE_UNAVAILABLE,
+    ) -> None:
         """Initialize my coordinator."""
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             # Name of the data. For logging purposes.
-            name="OmniLogic",
+            name=f"OmniLogic {config_entry.title}",
             # Polling interval. Will only be polled if there are subscribers.
             update_interval=timedelta(seconds=scan_interval),
         )
         self.omni = omni
+        # Shared with the coordinators of any other controllers
+        self._request_limiter = async_get_request_limiter(hass)
+        # Entities send their commands through this queue rather than straight to the library's API
+        self.omni_api = OmniLogicCommandQueue(omni._api, self._request_limiter)
+        # The configured scan interval is the baseline that the adaptive scheduler speeds up from, or backs off from
+        self.scan_interval = timedelta(seconds=scan_interval)
+        self._fast_poll_until = 0.0
+        self._unchanged_polls = 0
+        # Refreshes requested after commands are coalesced into a single poll once the delay has passed since the first of them
+        self.command_refresh_delay = command_refresh_delay
+        self._unsub_command_refresh: CALLBACK_TYPE | None = None
+        self._command_refresh_requested_at = 0.0
+        self.command_refresh_requests = 0
+        self.command_refreshes = 0
+        self.last_command_refresh_latency: float | None = None
+        # The entity index is built once per MSP config and then only has its telemetry re-bound on each poll
+        self._entity_index: EntityIndex = EntityIndex()
+        # A hash of the raw MSP config XML that the entity index was built from, and the config checksum the controller reported for it
+        self.config_fingerprint: str | None = None
+        self._config_checksum: int | None = None
+        # The raw documents the current data was parsed from, and the few telemetry documents before it, kept for the cache store and
+        # diagnostics so that neither has to fetch them from the controller again
+        self.mspconfig_snapshot: PayloadSnapshot | None = None
+        self.telemetry_snapshots: deque[PayloadSnapshot] = deque(maxlen=DIAGNOSTICS_TELEMETRY_SNAPSHOTS)
+        # The loop time the telemetry of the current data was requested at, None while it is restored from the cache store
+        self.telemetry_requested_at: float | None = None
+        self._cache_store = async_get_cache_store(hass, config_entry.entry_id)
+        self._cache_save_pending = False
+        # True while our data was restored from the cache store and has not yet been confirmed by a successful poll
+        self._restored = False
+        # Entities keep showing the last telemetry we received, marked stale, until this many polls in a row have failed
+        self.failures_before_unavailable = failures_before_unavailable
+        # The MSP config is also fetched on its own, slower, schedule, and on request, in case the controller's checksum misses a change
+        self.config_scan_interval = timedelta(seconds=config_scan_interval)
+        self._config_fetch_due = False
+        self._unsub_config_poll = async_track_time_interval(
+            hass, self._async_config_poll, self.config_scan_interval, name=f"{self.name} - config poll", cancel_on_shutdown=True
+        )
+        # The system IDs that were added and removed by the last MSP config change, waiting to be announced once the new data is set
+        self._pending_config_change: tuple[set[int], set[int]] | None = None
+        # The system IDs whose telemetry changed during the last poll, None means every listener must be notified
+        self._changed_system_ids: set[int] | None = None
+        self._previous_telemetry: dict[int, TelemetryTypes] = {}
+        self._listeners_saw_success = True
+        # Entities that render telemetry belonging to another system ID register it here so they are notified when it changes
+        self._related_contexts: dict[int, list[int]] = {}
+        # Entities waiting for the controller to confirm a command register here so they hear about every successful poll
+        self._every_poll_contexts: set[int] = set()
+        self.poll_stats = PollStats()
+        # Energy used by the filters, saved to the cache store along with the documents
+        self.energy = EnergyAccumulator()
+        # Entities only log their per-state-read traces when this is turned on in the options, as well as debug logging being enabled
+        self.trace = trace
+        # Scheduled polls happen at this fraction of the way through each interval of the event loop's clock
+        self.poll_phase = poll_phase if poll_phase is not None else _async_next_poll_phase(hass)
+
+    @property
+    def stale(self) -> bool:
+        """Whether our data has not been confirmed by the last poll, because it failed or because it was restored from the cache."""
+        return self._restored or self.poll_stats.consecutive_failures > 0
+
+    @property
+    def stale_attributes(self) -> dict[str, Any]:
+        """State attributes that entities add while our data is stale."""
+        if (last_success := self.poll_stats.last_success) is None:
+            return {"stale": True}
+        return {"stale": True, "last_successful_poll": last_success.isoformat()}
+
+    @property
+    def telemetry_expired(self) -> bool:
+        """Whether too many polls in a row have failed for the last telemetry we received to still be shown."""
+        return self.poll_stats.consecutive_failures >= self.failures_before_unavailable
+
+    @property
+    def config_changed_signal(self) -> str:
+        """The dispatcher signal sent when the MSP config of this controller changes."""
+        return SIGNAL_CONFIG_CHANGED.format(self.config_entry.entry_id)
 
-    async def _async_update_data(self) -> EntityIndexT:
+    async def _async_update_data(self) -> EntityIndex:
         """Update data via library."""
-        await self.omni.refresh(force=False)
+        stats = self.poll_stats
+        stats.polls += 1
+        started = time.perf_counter()
+        # Raised as UpdateFailed so that Home Assistant logs an outage once, and its recovery, rather than a traceback for every poll
+        try:
+            config_changed = await self._async_refresh_omni()
+        except (OmniTimeoutError, TimeoutError) as exc:
+            stats.timeouts += 1
+            self._poll_failed(exc)
+            msg = f"Timed out polling the OmniLogic: {exc!r}"
+            raise UpdateFailed(msg) from exc
+        except Exception as exc:
+            stats.errors += 1
+            self._poll_failed(exc)
+            _LOGGER.debug("Polling %s failed", self.name, exc_info=True)
+            msg = f"Error polling the OmniLogic: {exc!r}"
+            raise UpdateFailed(msg) from exc
+
+        index_started = time.perf_counter()
+        telemetry = telemetry_by_system_id(self.omni.telemetry)
+        if config_changed:
+            previous_system_ids = set(self._entity_index)
+            self._build_entity_index(telemetry)
+            self._changed_system_ids = None
+            if previous_system_ids:
+                current_system_ids = set(self._entity_index)
+                self._pending_config_change = (current_system_ids - previous_system_ids, previous_system_ids - current_system_ids)
+        else:
+            self._changed_system_ids = self._diff_telemetry(telemetry)
+            self._bind_telemetry(telemetry)
+        if self._restored:
+            # Every entity is updated so that none of them are left marked stale
+            self._restored = False
+            self._changed_system_ids = None
+        self._previous_telemetry = telemetry
+        self.update_interval = self._next_update_interval()
+        self.energy.add_samples(
+            self.hass.loop.time(),
+            {
+                system_id: filter_power(entity.telemetry)
+                for system_id, entity in self._entity_index.by_omni_type.get(OmniType.FILTER, {}).items()
+                if isinstance(entity.telemetry, TelemetryFilter)
+            },
+        )
+
+        finished = time.perf_counter()
+        stats.last_index = finished - index_started
+        stats.last_duration = finished - started
+        stats.consecutive_failures = 0
+        stats.last_success = dt_util.utcnow()
+        self._async_save_cache(config_changed)
+        return self._entity_index
+
+    def _poll_failed(self, exc: Exception) -> None:
+        """Count a failed poll, and back off retrying by doubling the interval for every failure after the first, up to the maximum."""
+        stats = self.poll_stats
+        stats.consecutive_failures += 1
+        stats.last_error = repr(exc)
+        self.update_interval = min(self.scan_interval * 2 ** min(stats.consecutive_failures - 1, 16), MAX_UPDATE_INTERVAL)
+
+    async def async_apply_state(self, targets: list[dict[str, Any]]) -> dict[str, Any]:
+        """Send the commands for a batch of targets in order, then refresh once for all of them.
+
+        Each target has a system_id, and any of state (on or off), speed (a percentage) and show (the name of a light show). Entities
+        are not shown an optimistic state, they are updated by the refresh that follows the batch.
+        """
+        started = time.perf_counter()
+        results: list[dict[str, Any]] = []
+        for target in targets:
+            try:
+                await self._async_apply_target(target)
+            except Exception as exc:  # noqa: BLE001  # Every target is reported on, one failing does not stop the rest
+                _LOGGER.warning("Failed to apply %s: %s", target, exc)
+                results.append({"system_id": target["system_id"], "success": False, "error": str(exc)})
+            else:
+                results.append({"system_id": target["system_id"], "success": True})
+        latency = time.perf_counter() - started
+        if any(result["success"] for result in results):
+            self.async_refresh_after_command()
+        return {"results": results, "latency": latency}
+
+    async def _async_apply_target(self, target: dict[str, Any]) -> None:
+        system_id: int = target["system_id"]
+        state: bool | None = target.get("state")
+        speed: int | None = target.get("speed")
+        show: str | None = target.get("show")
+        if (entity := self._entity_index.get(system_id)) is None:
+            msg = f"There is no equipment with system ID {system_id}"
+            raise OmniLogicError(msg)
+        bow_id = entity.msp_config.bow_id if entity.msp_config.bow_id is not None else -1
+        omni_type = entity.msp_config.omni_type
+        if state is None and speed is None and show is None:
+            msg = f"Nothing to set for {omni_type} {system_id}"
+            raise OmniLogicError(msg)
+
+        match omni_type:
+            case OmniType.CL_LIGHT:
+                light = cast("ColorLogicLight", self.omni.get_equipment_by_id(system_id))
+                if state is False:
+                    await self.omni_api.async_set_equipment(bow_id, system_id, False)
+                    return
+                if not light.is_ready:
+                    msg = f"Light {system_id} is in state {light.state.pretty()} and cannot be turned on yet"
+                    raise OmniLogicError(msg)
+                light_show = light.show
+                if show is not None:
+                    # Shows are named as the light entity shows them, like "Voodoo Lounge"
+                    if light.effects is None or (key := show.upper().replace(" ", "_")) not in light.effects:
+                        msg = f"Light {system_id} has no show {show}"
+                        raise OmniLogicError(msg)
+                    light_show = light.effects[key]
+                await self.omni_api.async_set_light_show(bow_id, system_id, light_show, speed=light.speed, brightness=light.brightness)
+            case OmniType.PUMP | OmniType.FILTER:
+                # Variable speed equipment takes a speed percentage, turning it on resumes the speed it last ran at
+                if speed is not None and state is not False:
+                    is_on: int | bool = speed
+                elif state:
+                    is_on = getattr(entity.telemetry, "last_speed", True)
+                else:
+                    is_on = False
+                await self.omni_api.async_set_equipment(bow_id, system_id, is_on)
+            case OmniType.RELAY | OmniType.VALVE_ACTUATOR if state is not None:
+                await self.omni_api.async_set_equipment(bow_id, system_id, state)
+            case OmniType.VIRT_HEATER if state is not None:
+                await self.omni_api.async_set_heater_enable(bow_id, system_id, state)
+            case OmniType.CHLORINATOR if state is not None:
+                await self.omni_api.async_set_chlorinator_enable(bow_id, state)
+            case _:
+                msg = f"Cannot apply {target} to {omni_type} {system_id}"
+                raise OmniLogicError(msg)
+
+    @callback
+    def async_refresh_after_command(self) -> None:
+        """Refresh once the controller has had time to act on a command, sharing the refresh with any other pending commands."""
+        self.command_refresh_requests += 1
+        self.async_poll_fast()
+        if self._unsub_command_refresh is not None:
+            return
+        self._command_refresh_requested_at = self.hass.loop.time()
+        self._unsub_command_refresh = async_call_later(self.hass, self.command_refresh_delay, self._async_command_refresh)
+
+    async def _async_command_refresh(self, _now: datetime) -> None:
+        """Run the refresh that every command since the last one has been waiting for."""
+        self._unsub_command_refresh = None
+        self.command_refreshes += 1
+        await self.async_refresh()
+        self.last_command_refresh_latency = self.hass.loop.time() - self._command_refresh_requested_at
+        _LOGGER.debug(
+            "Post-command refresh finished %.3fs after it was requested, %s of %s requests so far were coalesced",
+            self.last_command_refresh_latency,
+            self.command_refresh_requests - self.command_refreshes,
+            self.command_refresh_requests,
+        )
+
+    async def async_refresh_config(self) -> None:
+        """Fetch the MSP config along with the telemetry, whether or not the controller reports that it has changed."""
+        self._config_fetch_due = True
+        await self.async_refresh()
+
+    async def _async_config_poll(self, _now: datetime) -> None:
+        # Only worth doing while somebody is interested in the data, like the telemetry poll
+        if self._listeners:
+            await self.async_refresh_config()
 
-        from .models.entity_index import EntityIndexData
+    async def async_shutdown(self) -> None:
+        """Cancel any pending post-command refresh and the config poll along with the scheduled poll, and save the cache store."""
+        self._unsub_config_poll()
+        if self._unsub_command_refresh is not None:
+            self._unsub_command_refresh()
+            self._unsub_command_refresh = None
+        await super().async_shutdown()
+        if self._cache_save_pending:
+            # Written now rather than left to the delayed write, so a reload of the config entry starts from the latest energy totals
+            await self._cache_store.async_save(self._cache_data())
 
-        entities: EntityIndexT = {}
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll at our phase of the interval, rather than an interval after whenever the last poll finished."""
+        if self._update_interval_seconds is None or self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        interval = self._update_interval_seconds
+        now = self.hass.loop.time()
+        next_refresh = now + interval - (now - self.poll_phase * interval) % interval
+        # After an unscheduled refresh, e.g. one following a command, skip a phase that is too close to it
+        if next_refresh - now < interval / 2:
+            next_refresh += interval
+        self._unsub_refresh = self.hass.loop.call_at(next_refresh, self._async_handle_scheduled_refresh, next_refresh).cancel
+
+    @callback
+    def _async_handle_scheduled_refresh(self, scheduled_at: float) -> None:
+        """Start a scheduled poll, noting how late the event loop was in getting to it."""
+        lag = self.hass.loop.time() - scheduled_at
+        self.poll_stats.last_loop_lag = lag
+        self.poll_stats.max_loop_lag = max(self.poll_stats.max_loop_lag, lag)
+        self.config_entry.async_create_background_task(
+            self.hass, self._handle_refresh_interval(), name=f"{self.name} - refresh", eager_start=True
+        )
+
+    @callback
+    def async_poll_fast(self, window: float = FAST_POLL_WINDOW_SECONDS) -> None:
+        """Poll at the fast interval for a while, used after a command so its result shows up quickly."""
+        self._fast_poll_until = max(self._fast_poll_until, self.hass.loop.time() + window)
+        self._unchanged_polls = 0
+        if self.update_interval != FAST_UPDATE_INTERVAL:
+            self.update_interval = FAST_UPDATE_INTERVAL
+            # Bring the next poll forward rather than waiting out what could be a long backed off interval
+            if self._listeners:
+                self._schedule_refresh()
+
+    def _next_update_interval(self) -> timedelta:
+        """Pick the interval until the next poll based on what the last poll saw."""
+        if self._changed_system_ids is None or self._changed_system_ids:
+            self._unchanged_polls = 0
+        else:
+            self._unchanged_polls += 1
+
+        # Nothing is going to change while somebody is working on the pool
+        if self.omni.telemetry.backyard.state in SERVICE_BACKYARD_STATES:
+            return MAX_UPDATE_INTERVAL
+
+        if self.hass.loop.time() < self._fast_poll_until or any(
+            getattr(light.telemetry, "state", None) in TRANSITIONAL_LIGHT_STATES
+            for light in self._entity_index.by_omni_type.get(OmniType.CL_LIGHT, {}).values()
+        ):
+            return FAST_UPDATE_INTERVAL
+
+        # Double the interval for every unchanged poll past the threshold, up to the maximum
+        idle_polls = self._unchanged_polls - IDLE_POLLS_BEFORE_BACKOFF
+        if idle_polls < 0:
+            return self.scan_interval
+        return min(self.scan_interval * (1 << min(idle_polls + 1, 16)), MAX_UPDATE_INTERVAL)
+
+    async def _async_refresh_omni(self) -> bool:
+        """Fetch the latest telemetry, and the MSP config if the controller reports that it has changed or a config poll is due.
+
+        Returns True if the MSP config differs from the one we last parsed, the parse and rebuild of everything derived from the config
+        is skipped when it does not.
+        """
+        # Hold the library's refresh lock so equipment commands refreshing through the library do not interleave with us
+        async with self.omni._refresh_lock:
+            async with self._request_limiter:
+                requested_at = self.hass.loop.time()
+                started = time.perf_counter()
+                raw_telemetry = await self.omni._api.async_get_telemetry(raw=True)
+                received = time.perf_counter()
+            telemetry = Telemetry.load_xml(raw_telemetry)
+            network, parse = received - started, time.perf_counter() - received
+            telemetry_timings = (network, parse)
+
+            config_changed = False
+            # Controllers with status_version >= 11 report a checksum of their config in the telemetry, older firmware always reports 0
+            # and so only has its config fetched by the config poll
+            if self.config_fingerprint is None or self._config_fetch_due or telemetry.backyard.config_checksum != self._config_checksum:
+                self._config_fetch_due = False
+                self.poll_stats.config_fetches += 1
+                async with self._request_limiter:
+                    started = time.perf_counter()
+                    raw_mspconfig = await self.omni._api.async_get_mspconfig(raw=True)
+                    received = time.perf_counter()
+                network += received - started
+                fingerprint = hashlib.sha256(raw_mspconfig.encode()).hexdigest()
+                if fingerprint != self.config_fingerprint:
+                    _LOGGER.debug("MSP config fingerprint changed from %s to %s", self.config_fingerprint, fingerprint)
+                    self.omni.mspconfig = MSPConfig.load_xml(raw_mspconfig)
+                    parse += time.perf_counter() - received
+                    self.config_fingerprint = fingerprint
+                    self.mspconfig_snapshot = PayloadSnapshot.from_payload(
+                        raw_mspconfig, dt_util.utcnow(), received - started, time.perf_counter() - received
+                    )
+                    config_changed = True
+                self._config_checksum = telemetry.backyard.config_checksum
+
+            self.telemetry_snapshots.append(PayloadSnapshot.from_payload(raw_telemetry, dt_util.utcnow(), *telemetry_timings))
+            self._sync_library(telemetry)
+            self.telemetry_requested_at = requested_at
+        self.poll_stats.last_network = network
+        self.poll_stats.last_parse = parse
+        return config_changed
+
+    def _sync_library(self, telemetry: Telemetry) -> None:
+        """Keep the library's own bookkeeping in step so its refresh() does not immediately fetch everything again."""
+        self.omni.telemetry = telemetry
+        self.omni._telemetry_last_updated = time.time()
+        self.omni._telemetry_dirty = False
+        self.omni._mspconfig_checksum = telemetry.backyard.config_checksum
+        self.omni._update_equipment()
+
+    async def async_load_cache(self) -> bool:
+        """Restore the MSP config and telemetry saved by an earlier run, returning False if there is nothing usable to restore.
+
+        The restored data is marked stale until the next successful poll, but lets the entities be set up without waiting on the
+        controller.
+        """
+        if (cache := await self._cache_store.async_load()) is None:
+            return False
+        self.energy.restore(cache.get("energy", {}))
+        try:
+            mspconfig = MSPConfig.load_xml(cache["msp_config"])
+            telemetry = Telemetry.load_xml(cache["telemetry"])
+        except Exception:  # noqa: BLE001  # Whatever is wrong with the cache, we can still start up by polling the controller
+            _LOGGER.warning("Ignoring the cached MSP config and telemetry for %s, they could not be parsed", self.name, exc_info=True)
+            return False
+
+        self.mspconfig_snapshot = PayloadSnapshot.from_payload(cache["msp_config"])
+        self.telemetry_snapshots.append(PayloadSnapshot.from_payload(cache["telemetry"]))
+        self.config_fingerprint = hashlib.sha256(cache["msp_config"].encode()).hexdigest()
+        # Firmware that always reports a checksum of 0 gets its config fetched again on the first poll, as we cannot tell if it changed
+        self._config_checksum = cache["config_checksum"] or None
+        self.omni.mspconfig = mspconfig
+        self._sync_library(telemetry)
+        self._previous_telemetry = telemetry_by_system_id(telemetry)
+        self._build_entity_index(self._previous_telemetry)
+        self._restored = True
+        self.data = self._entity_index
+        _LOGGER.debug("Restored %s devices from the cache for %s", len(self._entity_index), self.name)
+        return True
+
+    @callback
+    def _async_save_cache(self, config_changed: bool) -> None:
+        """Save the documents behind the current data to the cache store, batching the writes of successive polls.
+
+        The cache is only read at startup, so to spare the flash storage of small installs a new MSP config is saved soon after it is
+        received, but telemetry and energy only every few hours, and when we shut down.
+        """
+        if config_changed:
+            # The store brings forward a write that is already pending to the shorter delay
+            self._cache_store.async_delay_save(self._cache_data, CACHE_SAVE_DELAY_SECONDS)
+        elif not self._cache_save_pending:
+            self._cache_store.async_delay_save(self._cache_data, CACHE_TELEMETRY_SAVE_DELAY_SECONDS)
+        self._cache_save_pending = True
+
+    def _cache_data(self) -> dict[str, Any]:
+        self._cache_save_pending = False
+        return {
+            "msp_config": self.mspconfig_snapshot.payload if self.mspconfig_snapshot else None,
+            "telemetry": self.telemetry_snapshots[-1].payload if self.telemetry_snapshots else None,
+            "config_checksum": self._config_checksum,
+            "energy": self.energy.totals,
+        }
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        """Announce an MSP config change once the entity index built from it is available as our data."""
+        if not self.last_update_success and self.poll_stats.consecutive_failures > 1:
+            # Home Assistant only notifies listeners of the first of a run of failed polls, we also have the poll statistics sensors
+            # and the entities going unavailable to update
+            self.async_update_listeners()
+        if self._pending_config_change is None or not self.last_update_success:
+            return
+        added, removed = self._pending_config_change
+        self._pending_config_change = None
+        _LOGGER.info("OmniLogic MSP config changed, %s devices added and %s devices removed", len(added), len(removed))
+        async_dispatcher_send(self.hass, self.config_changed_signal)
+        self.hass.bus.async_fire(
+            EVENT_CONFIG_CHANGED,
+            {
+                "entry_id": self.config_entry.entry_id,
+                "added_system_ids": sorted(added),
+                "removed_system_ids": sorted(removed),
+            },
+        )
+
+    def _build_entity_index(self, telemetry: dict[int, TelemetryTypes]) -> None:
+        """Build a fresh entity index from the current MSP config and telemetry."""
+        entities = EntityIndex()
         for device in device_walk(self.omni.mspconfig):
-            entities[device.system_id] = EntityIndexData(
-                msp_config=device,
-                telemetry=self.omni.telemetry.get_telem_by_systemid(device.system_id),
+            entities.add(
+                EntityIndexData(
+                    msp_config=device,
+                    telemetry=telemetry.get(device.system_id),
+                ),
+                OMNI_TO_HASS_TYPES.get(device.omni_type),
             )
         _LOGGER.debug("OmniLogic reported %s devices in the entity index", len(entities))
-        return entities
+        self._entity_index = entities
+
+    def _bind_telemetry(self, telemetry: dict[int, TelemetryTypes]) -> None:
+        """Point the existing entity index entries at the latest telemetry."""
+        for system_id, entity in self._entity_index.items():
+            entity.telemetry = telemetry.get(system_id)
+
+    def _diff_telemetry(self, telemetry: dict[int, TelemetryTypes]) -> set[int] | None:
+        """Return the system IDs whose telemetry differs from the previous poll.
+
+        Returns None if every entity needs to be updated, which is the case when the backyard state changes as that drives the
+        availability of all equipment.
+        """
+        previous_backyard = self._previous_telemetry.get(BACKYARD_SYSTEM_ID)
+        current_backyard = telemetry.get(BACKYARD_SYSTEM_ID)
+        if getattr(previous_backyard, "state", None) != getattr(current_backyard, "state", None):
+            return None
+
+        changed = {system_id for system_id, telem in telemetry.items() if self._previous_telemetry.get(system_id) != telem}
+        changed.update(self._previous_telemetry.keys() - telemetry.keys())
+        _LOGGER.debug("Telemetry changed for %s of %s devices: %s", len(changed), len(telemetry), changed)
+        return changed
+
+    @callback
+    def async_relate_system_id(self, context: int, system_id: int) -> CALLBACK_TYPE:
+        """Notify listeners registered with context whenever the telemetry for system_id changes."""
+        self._related_contexts.setdefault(system_id, []).append(context)
+
+        @callback
+        def _remove() -> None:
+            self._related_contexts[system_id].remove(context)
+
+        return _remove
+
+    @callback
+    def async_notify_every_poll(self, context: int) -> CALLBACK_TYPE:
+        """Notify listeners registered with context after every successful poll, whether or not their telemetry changed."""
+        self._every_poll_contexts.add(context)
+
+        @callback
+        def _remove() -> None:
+            self._every_poll_contexts.discard(context)
+
+        return _remove
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners affected by the last poll, or all of them if we cannot tell which were affected.
+
+        The poll statistics sensors are updated last, once the update of every other listener has been timed, so they report this poll.
+        """
+        started = time.perf_counter()
+        try:
+            self._async_update_affected_listeners()
+        finally:
+            self.poll_stats.last_fanout = time.perf_counter() - started
+        for update_callback, context in list(self._listeners.values()):
+            if context == POLL_STATS_CONTEXT:
+                update_callback()
+
+    @callback
+    def _async_update_affected_listeners(self) -> None:
+        changed, self._changed_system_ids = self._changed_system_ids, None
+        if not self.last_update_success:
+            # Of a run of failed polls, entities only need to hear about the first, which marks them stale, and the one that makes
+            # them unavailable. Listeners without a context, like the energy sensors, hear about every one.
+            failures = self.poll_stats.consecutive_failures
+            changed = None if failures in {1, self.failures_before_unavailable} else set()
+        elif not self._listeners_saw_success:
+            changed = None
+        self._listeners_saw_success = self.last_update_success
+        if changed is None:
+            for update_callback, context in list(self._listeners.values()):
+                if context != POLL_STATS_CONTEXT:
+                    update_callback()
+            return
+
+        contexts = set(changed)
+        if self.last_update_success:
+            contexts.update(self._every_poll_contexts)
+        for system_id in changed:
+            contexts.update(self._related_contexts.get(system_id, ()))
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in contexts:
+                update_callback()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.diagnostics import async_redact_data
@@ -23,8 +24,31 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry:
 
     coordinator: OmniLogicCoordinator = hass.data[DOMAIN][config_entry.entry_id].get(KEY_COORDINATOR)
     if coordinator:
-        diag["msp_config"] = await coordinator.omni._api.async_get_mspconfig(raw=True)
-        diag["telemetry"] = await coordinator.omni._api.async_get_telemetry(raw=True)
+        # Served from the documents the coordinator last received rather than fetched again, which would add round-trips to the
+        # controller and might not be answered by one that is misbehaving
+        snapshots = list(coordinator.telemetry_snapshots)
+        if coordinator.mspconfig_snapshot is not None and snapshots:
+            diag["msp_config"] = coordinator.mspconfig_snapshot.payload
+            diag["telemetry"] = snapshots[-1].payload
+        else:
+            diag["msp_config"] = await coordinator.omni._api.async_get_mspconfig(raw=True)
+            diag["telemetry"] = await coordinator.omni._api.async_get_telemetry(raw=True)
+        diag["payloads"] = {
+            "msp_config": coordinator.mspconfig_snapshot.as_dict() if coordinator.mspconfig_snapshot else None,
+            "telemetry": [snapshot.as_dict() for snapshot in snapshots],
+        }
+        # The telemetry received before the latest, oldest first
+        diag["telemetry_history"] = [snapshot.as_dict() | {"telemetry": snapshot.payload} for snapshot in snapshots[:-1]]
+        diag["command_refresh"] = {
+            "delay": coordinator.command_refresh_delay,
+            "requests": coordinator.command_refresh_requests,
+            "refreshes": coordinator.command_refreshes,
+            "last_latency": coordinator.last_command_refresh_latency,
+        }
+        diag["polls"] = asdict(coordinator.poll_stats)
+        diag["commands"] = {
+            kind: asdict(stats) | {"mean_latency": stats.mean_latency} for kind, stats in coordinator.omni_api.stats.items()
+        }
 
     # There are no credentials or other secrets within the diagnostic data for this integration
     return async_redact_data(diag, [])
@@ -0,0 +1,51 @@
+"""Accumulate the energy used by the filter pumps from the power reported in their telemetry."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pyomnilogic_local.omnitypes import FilterState
+
+from .const import ENERGY_MAX_SAMPLE_GAP_SECONDS
+
+if TYPE_CHECKING:
+    from pyomnilogic_local.models.telemetry import TelemetryFilter
+
+# The controller keeps reporting the power a filter last drew after it stops, so it only counts in these states
+FILTER_RUNNING_STATES = frozenset(
+    {
+        FilterState.ON,
+        FilterState.PRIMING,
+        FilterState.HEATER_EXTEND,
+        FilterState.CSAD_EXTEND,
+        FilterState.FILTER_FORCE_PRIMING,
+        FilterState.FILTER_SUPERCHLORINATE,
+    }
+)
+
+
+def filter_power(telemetry: TelemetryFilter) -> int:
+    """The power in watts that a filter is drawing."""
+    return telemetry.power if telemetry.state in FILTER_RUNNING_STATES else 0
+
+
+class EnergyAccumulator:
+    """Integrates the power of each filter over time into a running total in kWh, a sample at a time as the controller is polled."""
+
+    def __init__(self) -> None:
+        self.totals: dict[int, float] = {}
+        # The loop time and power of the last sample of each filter
+        self._last_samples: dict[int, tuple[float, float]] = {}
+
+    def add_samples(self, now: float, powers: dict[int, float]) -> None:
+        """Add the power each filter is drawing now to its total."""
+        for system_id, power in powers.items():
+            if (last := self._last_samples.get(system_id)) is not None and 0 < now - last[0] <= ENERGY_MAX_SAMPLE_GAP_SECONDS:
+                # A left Riemann sum, the power of the last sample is taken to have held until now
+                self.totals[system_id] = self.totals.get(system_id, 0.0) + last[1] * (now - last[0]) / 3_600_000
+            self._last_samples[system_id] = (now, power)
+
+    def restore(self, totals: dict[str, float]) -> None:
+        """Carry on from totals saved by an earlier run, keyed on the system ID as JSON object keys are."""
+        for system_id, total in totals.items():
+            self.totals[int(system_id)] = max(self.totals.get(int(system_id), 0.0), total)
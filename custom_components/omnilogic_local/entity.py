@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
-from typing import Any, Generic, TypeVar, cast
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
 
-from homeassistant.core import callback
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from pyomnilogic_local import (
     CSAD,
@@ -27,9 +31,19 @@ from pyomnilogic_local import (
 from pyomnilogic_local.models.mspconfig import MSPConfig
 from pyomnilogic_local.omnitypes import OmniType
 
-from .const import BACKYARD_SYSTEM_ID, DOMAIN, MANUFACTURER
+from .const import DOMAIN, MANUFACTURER, OPTIMISTIC_STATE_TTL_SECONDS
 from .coordinator import OmniLogicCoordinator
 from .models.entity_index import EntityIndexData, TelemetryTypes
+from .utils import backyard_identifier, bow_identifier
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from datetime import datetime
+
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 T = TypeVar("T", bound=EntityIndexData)
 
@@ -55,8 +69,82 @@ EquipmentTypes = TypeVar(
 )
 
 
+async def async_setup_entities(
+    coordinator: OmniLogicCoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    build_entities: Callable[[OmniLogicCoordinator], Sequence[Entity]],
+    domain: str,
+) -> None:
+    """Add the entities for a platform, and any new ones whenever the MSP config changes."""
+    added: set[str | None] = set()
+
+    @callback
+    def _async_add_new_entities(entities: Sequence[Entity] | None = None) -> None:
+        if entities is None:
+            entities = build_entities(coordinator)
+        new_entities = [entity for entity in entities if entity.unique_id not in added]
+        if not new_entities:
+            return
+        for entity in new_entities:
+            added.add(entity.unique_id)
+            # Forgotten once removed, so a device that leaves the MSP config and comes back is added again
+            entity.async_on_remove(partial(added.discard, entity.unique_id))
+        async_add_entities(new_entities)
+
+    entities = build_entities(coordinator)
+    await _async_migrate_unique_ids(coordinator.hass, entry, domain, entities)
+    _async_add_new_entities(entities)
+    entry.async_on_unload(async_dispatcher_connect(coordinator.hass, coordinator.config_changed_signal, _async_add_new_entities))
+
+
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry, domain: str, entities: Sequence[Entity]) -> None:
+    """Move the registry entries of entities from unique IDs that ended in their name to ones that do not include the device name.
+
+    Only entities whose device has not been renamed since they were registered can be matched up with their old unique ID.
+    """
+    registry = er.async_get(hass)
+    unique_ids = {
+        entity.legacy_unique_id: entity.unique_id
+        for entity in entities
+        if isinstance(entity, OmniLogicEntity) and entity.legacy_unique_id != entity.unique_id
+    }
+
+    @callback
+    def _async_migrate_entry(registry_entry: er.RegistryEntry) -> dict[str, Any] | None:
+        if registry_entry.domain != domain or (unique_id := unique_ids.get(registry_entry.unique_id)) is None:
+            return None
+        if registry.async_get_entity_id(domain, DOMAIN, unique_id) is not None:
+            _LOGGER.warning("Not migrating %s to unique ID %s, another entity already has it", registry_entry.entity_id, unique_id)
+            return None
+        _LOGGER.debug("Migrating %s from unique ID %s to %s", registry_entry.entity_id, registry_entry.unique_id, unique_id)
+        return {"new_unique_id": unique_id}
+
+    if unique_ids:
+        await er.async_migrate_entries(hass, entry.entry_id, _async_migrate_entry)
+
+
+@dataclass(frozen=True, slots=True)
+class PublishPolicy:
+    """How much, and for how long, a noisy entity's state has to change before the change is written to Home Assistant.
+
+    A numeric state is not written while it stays within the larger of absolute or relative times the last written value of it. Any
+    other state has to hold its new value for hold seconds. Either way, changes are written at most every min_interval seconds.
+    """
+
+    absolute: float = 0.0
+    relative: float = 0.0
+    min_interval: float = 0.0
+    hold: float = 0.0
+
+
 class OmniLogicEntity(CoordinatorEntity[OmniLogicCoordinator], Generic[EquipmentTypes, T]):
     _attr_has_entity_name = True
+    # Tells apart the entities of a platform on the same device in their unique ID, entities with a fixed name default to it. It
+    # must not include the name of the device, which can be changed on the controller.
+    _unique_id_suffix: str | None = None
+    # Entities whose telemetry jitters set this so that not every small fluctuation ends up in the recorder
+    _publish_policy: PublishPolicy | None = None
 
     equipment: EquipmentTypes
     coordinator: OmniLogicCoordinator
@@ -87,25 +175,135 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicCoordinator], Generic[Equipment
                 self.bow_id = -1
 
         self._extra_state_attributes: dict[str, Any] = {}
+        self._base_state_attributes: dict[str, Any] = {"omni_system_id": self.system_id, "omni_bow_id": self.bow_id}
+        # Properties derived only from the MSP config, computed on first use and forgotten when the MSP config changes
+        self._static_properties: dict[str, Any] = {}
+        self._unique_id: str | None = None
+        # Telemetry values we expect the controller to report after a command, with the loop time the command was sent at
+        self._optimistic_telemetry: dict[str, tuple[Any, float]] = {}
+        self._optimistic_data: tuple[TelemetryTypes, T] | None = None
+        self._unsub_optimistic_expiry: CALLBACK_TYPE | None = None
+        self._unsub_every_poll: CALLBACK_TYPE | None = None
+        # The availability, staleness and state we last wrote under the publish policy, with the loop time we wrote them at, and a
+        # changed state we are waiting to hold for long enough, with the loop time it was first seen at
+        self._published: tuple[tuple[bool, bool, Any], float] | None = None
+        self._pending_state: tuple[Any, float] | None = None
+        self._unsub_deferred_publish: CALLBACK_TYPE | None = None
         subclass_name = self.__class__.__name__
         equipment_name = self.equipment.name if self.equipment else "Unknown"
         omni_type = self.equipment.omni_type if self.equipment else "Unknown"
         _LOGGER.debug("Configuring %s for %s - SystemID: %s, Name: %s", subclass_name, omni_type, self.system_id, equipment_name)
 
+    @property
+    def related_system_ids(self) -> set[int]:
+        """System IDs other than our own whose telemetry is rendered by this entity."""
+        return set()
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to telemetry changes of related devices as well as our own."""
+        await super().async_added_to_hass()
+        for system_id in self.related_system_ids - {self.system_id}:
+            self.async_on_remove(self.coordinator.async_relate_system_id(self.coordinator_context, system_id))
+        self.async_on_remove(async_dispatcher_connect(self.hass, self.coordinator.config_changed_signal, self._async_handle_config_changed))
+        self.async_on_remove(self._async_cancel_optimistic_tracking)
+        self.async_on_remove(self._async_cancel_deferred_publish)
+
+    @callback
+    def _async_handle_config_changed(self) -> None:
+        """Pick up a renamed device, or remove this entity if its device is no longer part of the MSP config."""
+        if self.system_id in self.coordinator.data:
+            self.equipment = cast("EquipmentTypes", self.coordinator.omni.get_equipment_by_id(self.system_id))
+            name = self.name
+            self._static_properties.clear()
+            if self.name != name and self.registry_entry is not None:
+                # The unique ID does not include the name, so the entity is renamed in place
+                er.async_get(self.hass).async_update_entity(self.entity_id, original_name=self.name)
+            return
+        _LOGGER.debug("removing %s, system ID %s is no longer in the MSP config", self.entity_id, self.system_id)
+        if self.registry_entry is not None:
+            er.async_get(self.hass).async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove(force_remove=True))
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         # When we handle an update from the coordinator, we want to update the equipment object which we are holding a reference to
         # as it is the most current data from the library.
         if self.system_id is not None:
-            _LOGGER.debug("updating %s - %s: %s", self.system_id, self.equipment.name, self.equipment)
+            if self.coordinator.trace and _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("updating %s - %s: %s", self.system_id, self.equipment.name, self.equipment)
             self.equipment = cast("EquipmentTypes", self.coordinator.omni.get_equipment_by_id(self.system_id))
+        self._reconcile_optimistic_telemetry()
+        if self._publish_policy is None:
+            self.async_write_ha_state()
+        else:
+            self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        """Write our state if the publish policy lets the change through, or once it will."""
+        self._async_cancel_deferred_publish()
+        policy = cast("PublishPolicy", self._publish_policy)
+        current = (self.available, self.coordinator.stale, self.state)
+        now = self.hass.loop.time()
+        if self._published is None:
+            self._async_write_published(current, now)
+            return
+        published, published_at = self._published
+        if current == published:
+            self._pending_state = None
+            return
+        # Going unavailable, stale or unknown, and coming back, is always written straight away
+        if current[:2] != published[:2] or current[2] is None or published[2] is None:
+            self._async_write_published(current, now)
+            return
+
+        publish_at = published_at + policy.min_interval
+        try:
+            value, published_value = float(current[2]), float(published[2])
+        except (TypeError, ValueError):
+            if self._pending_state is None or self._pending_state[0] != current[2]:
+                self._pending_state = (current[2], now)
+            publish_at = max(publish_at, self._pending_state[1] + policy.hold)
+        else:
+            if abs(value - published_value) <= max(policy.absolute, policy.relative * abs(published_value)):
+                return
+
+        if now >= publish_at:
+            self._async_write_published(current, now)
+        else:
+            # We are only notified when our telemetry changes, so a change that is held back is checked again once it is due
+            self._unsub_deferred_publish = async_call_later(self.hass, publish_at - now, self._async_deferred_publish)
+
+    @callback
+    def _async_write_published(self, current: tuple[bool, bool, Any], now: float) -> None:
+        self._published = (current, now)
+        self._pending_state = None
         self.async_write_ha_state()
 
+    @callback
+    def _async_deferred_publish(self, _now: datetime) -> None:
+        self._unsub_deferred_publish = None
+        self._async_publish()
+
+    @callback
+    def _async_cancel_deferred_publish(self) -> None:
+        if self._unsub_deferred_publish is not None:
+            self._unsub_deferred_publish()
+            self._unsub_deferred_publish = None
+
     @property
     def data(self) -> T:
-        """Returns the data for this entity from the coordinator."""
-        return cast("T", self.coordinator.data[self.system_id])
+        """Returns the data for this entity from the coordinator, with any optimistic telemetry laid over it."""
+        data = cast("T", self.coordinator.data[self.system_id])
+        if not self._optimistic_telemetry or data.telemetry is None:
+            return data
+        # The overlaid copy is only rebuilt when the coordinator binds new telemetry or the optimistic values change
+        if self._optimistic_data is None or self._optimistic_data[0] is not data.telemetry:
+            update = {key: value for key, (value, _) in self._optimistic_telemetry.items()}
+            self._optimistic_data = (data.telemetry, replace(data, telemetry=data.telemetry.model_copy(update=update)))
+        return self._optimistic_data[1]
 
     def get_system_config(self) -> MSPConfig:
         """Returns the system config for the coordinator."""
@@ -116,12 +314,74 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicCoordinator], Generic[Equipment
         return self.coordinator.omni.telemetry.get_telem_by_systemid(system_id)
 
     def set_telemetry(self, telemetry: dict[str, Any]) -> None:
-        """Updates the telemetry for this entity in the coordinator data."""
-        # This is a bit of a hack to update the local state before the next refresh
+        """Show the telemetry expected after a command until the controller confirms it, contradicts it given time to act, or it expires."""
+        sent_at = self.hass.loop.time()
         for key, value in telemetry.items():
-            setattr(self.data.telemetry, key, value)
+            self._optimistic_telemetry[key] = (value, sent_at)
+        self._optimistic_data = None
+        self._async_cancel_optimistic_tracking()
+        self._unsub_optimistic_expiry = async_call_later(self.hass, OPTIMISTIC_STATE_TTL_SECONDS, self._async_expire_optimistic_telemetry)
+        # Polls that report the same telemetry as the one before still have to confirm or revert the optimistic values
+        self._unsub_every_poll = self.coordinator.async_notify_every_poll(self.coordinator_context)
+        self.coordinator.async_refresh_after_command()
         self.async_write_ha_state()
 
+    def _telemetry_matches(self, key: str, expected: Any, actual: Any) -> bool:
+        """Whether the controller reporting actual for a telemetry key confirms the optimistic value we expected.
+
+        Subclasses whose command can be confirmed by more than one reported value, like a filter that is asked to turn on and reports
+        that it is priming or already running, override this.
+        """
+        return bool(actual == expected)
+
+    def _reconcile_optimistic_telemetry(self) -> None:
+        """Drop optimistic values once the controller confirms them, and revert any it still contradicts after it had time to act.
+
+        A poll that starts sooner than command_refresh_delay after the command, like the first fast poll, can still report the state from
+        before the controller applied it, so only a later poll, or the optimistic value expiring without one, reverts it.
+        """
+        if not self._optimistic_telemetry:
+            return
+        telemetry = self.coordinator.data[self.system_id].telemetry
+        requested_at = self.coordinator.telemetry_requested_at
+        now = self.hass.loop.time()
+        for key, (value, sent_at) in list(self._optimistic_telemetry.items()):
+            actual = getattr(telemetry, key, None)
+            if self._telemetry_matches(key, value, actual):
+                del self._optimistic_telemetry[key]
+            elif (requested_at is not None and requested_at >= sent_at + self.coordinator.command_refresh_delay) or (
+                now >= sent_at + OPTIMISTIC_STATE_TTL_SECONDS
+            ):
+                del self._optimistic_telemetry[key]
+                _LOGGER.warning(
+                    "%s (system ID %s) reported %s=%s rather than %s %.1fs after the command, reverting",
+                    self.entity_id,
+                    self.system_id,
+                    key,
+                    actual,
+                    value,
+                    now - sent_at,
+                )
+        self._optimistic_data = None
+        if not self._optimistic_telemetry:
+            self._async_cancel_optimistic_tracking()
+
+    @callback
+    def _async_expire_optimistic_telemetry(self, _now: datetime) -> None:
+        """Revert any optimistic telemetry that is still unconfirmed once it expires, even if no poll has notified us."""
+        self._unsub_optimistic_expiry = None
+        self._reconcile_optimistic_telemetry()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_cancel_optimistic_tracking(self) -> None:
+        if self._unsub_optimistic_expiry is not None:
+            self._unsub_optimistic_expiry()
+            self._unsub_optimistic_expiry = None
+        if self._unsub_every_poll is not None:
+            self._unsub_every_poll()
+            self._unsub_every_poll = None
+
     def set_config(self, config: dict[str, Any]) -> None:
         """Updates the config for this entity in the coordinator data."""
         for key, value in config.items():
@@ -130,7 +390,13 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicCoordinator], Generic[Equipment
 
     @property
     def available(self) -> bool:
-        _LOGGER.debug("available %s - %s: %s. %s", self.system_id, self.equipment.name, self.equipment.is_ready, self.equipment.telemetry)
+        if self.coordinator.trace and _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "available %s - %s: %s. %s", self.system_id, self.equipment.name, self.equipment.is_ready, self.equipment.telemetry
+            )
+
+        if self.coordinator.telemetry_expired:
+            return False
 
         # Sensors (air/water temp) do not have their own telemetry object;
         # their data comes from Backyard/BodyOfWater telemetry.
@@ -145,36 +411,50 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicCoordinator], Generic[Equipment
     @property
     def device_info(self) -> DeviceInfo:
         """Return the device info."""
-        # If we have a BOW ID, then we associate with that BOWs device, if not, we associate with the Backyard
-        if self.equipment.bow_id is not None and self.equipment.bow_id != -1:
-            identifiers = {(DOMAIN, f"bow_{self.bow_id}")}
-        else:
-            identifiers = {(DOMAIN, f"backyard_{BACKYARD_SYSTEM_ID}")}
-        return DeviceInfo(
-            identifiers=identifiers,
-            manufacturer=MANUFACTURER,
-        )
+        if "device_info" not in self._static_properties:
+            # If we have a BOW ID, then we associate with that BOWs device, if not, we associate with the Backyard
+            entry_id = self.coordinator.config_entry.entry_id
+            if self.equipment.bow_id is not None and self.equipment.bow_id != -1:
+                identifiers = {bow_identifier(entry_id, self.bow_id)}
+            else:
+                identifiers = {backyard_identifier(entry_id)}
+            self._static_properties["device_info"] = DeviceInfo(
+                identifiers=identifiers,
+                manufacturer=MANUFACTURER,
+            )
+        return cast("DeviceInfo", self._static_properties["device_info"])
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        base_attributes: dict[str, Any] = {
-            "omni_system_id": self.system_id,
-            "omni_bow_id": self.bow_id,
-        }
-        return self._extra_state_attributes | base_attributes
+        # Home Assistant copies these into the state, so the same dict is handed out every time, do not modify it
+        if self.coordinator.stale:
+            # Restored from the cache at startup, or the last poll of the controller failed
+            return self._extra_state_attributes | self._base_state_attributes | self.coordinator.stale_attributes
+        if not self._extra_state_attributes:
+            return self._base_state_attributes
+        return self._extra_state_attributes | self._base_state_attributes
+
+    def _build_name(self) -> Any:
+        """Build the name of this entity, subclasses that derive their name from the MSP config override this rather than name."""
+        return self._attr_name if hasattr(self, "_attr_name") else self.equipment.name
 
     @property
     def name(self) -> Any:
-        return self._attr_name if hasattr(self, "_attr_name") else self.equipment.name
+        if "name" not in self._static_properties:
+            self._static_properties["name"] = self._build_name()
+        return self._static_properties["name"]
 
     @property
     def unique_id(self) -> str | None:
-        return f"{self.bow_id} {self.system_id} {self.name}"
-
-    # @callback
-    async def _schedule_refresh_callback(self, now: datetime) -> None:
-        """Callback function executed by async_call_later."""
-        # `now` is the timestamp argument required by async_call_later callbacks
+        # The entity registry is keyed on this, so it is made only of parts that stay the same when the device is renamed
+        if self._unique_id is None:
+            suffix = self._unique_id_suffix if self._unique_id_suffix is not None else getattr(self, "_attr_name", None)
+            self._unique_id = f"{self.coordinator.config_entry.entry_id} {self.bow_id} {self.system_id}"
+            if suffix:
+                self._unique_id = f"{self._unique_id} {suffix}"
+        return self._unique_id
 
-        # Use the non-blocking version of the refresh request
-        await self.coordinator.async_request_refresh()
+    @property
+    def legacy_unique_id(self) -> str:
+        """The unique ID this entity was registered under before it stopped including the name, used to migrate its registry entry."""
+        return f"{self.coordinator.config_entry.entry_id} {self.bow_id} {self.system_id} {self.name}"
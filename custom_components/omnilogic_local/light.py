@@ -2,25 +2,32 @@ from __future__ import annotations
 
 import logging
 import math
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_EFFECT, LightEntity
 from homeassistant.components.light.const import ColorMode, LightEntityFeature
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.event import async_call_later
 from homeassistant.util.color import brightness_to_value, value_to_brightness
-from pyomnilogic_local import ColorLogicLight, OmniEquipmentNotInitializedError
-from pyomnilogic_local.omnitypes import ColorLogicBrightness, ColorLogicLightType, ColorLogicPowerState
+from pyomnilogic_local import ColorLogicLight
+from pyomnilogic_local.api.exceptions import OmniLogicError as OmniLogicAPIError
+from pyomnilogic_local.omnitypes import ColorLogicBrightness, ColorLogicLightType, ColorLogicPowerState, LightShows
 
 from .coordinator import OmniLogicCoordinator
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from datetime import datetime
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, KEY_COORDINATOR, UPDATE_DELAY_SECONDS
-from .entity import OmniLogicEntity
+from .const import DOMAIN, KEY_COORDINATOR, LIGHT_READY_TIMEOUT_SECONDS
+from .entity import OmniLogicEntity, async_setup_entities
 from .models.entity_index import EntityIndexColorLogicLight
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,15 +38,20 @@ BRIGHTNESS_SCALE = (0, 4)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the light platform."""
     coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.LIGHT)
+
+
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[LightEntity]:
+    """Build the light entities for the devices in the coordinator data."""
     entities: list[LightEntity] = []
     _LOGGER.debug("Setting up light platform")
 
     all_lights = coordinator.omni.all_lights
     for _, _, light in all_lights.items():
-        entities.append(OmniLogicLightEntity(coordinator=coordinator, equipment=light))
+        entities.append(OmniLogicLightEntity(coordinator=coordinator, context=light))
 
     _LOGGER.debug("Adding %s light entities", len(entities))
-    async_add_entities(entities)
+    return entities
 
 
 class OmniLogicLightEntity(OmniLogicEntity[ColorLogicLight, EntityIndexColorLogicLight], LightEntity):
@@ -55,11 +67,17 @@ class OmniLogicLightEntity(OmniLogicEntity[ColorLogicLight, EntityIndexColorLogi
 
     _attr_supported_features = LightEntityFeature.EFFECT
 
+    def __init__(self, coordinator: OmniLogicCoordinator, context: ColorLogicLight | int) -> None:
+        super().__init__(coordinator, context)
+        # The latest command requested while the light was not ready for it, and when we give up on it
+        self._held_command: Callable[[], Awaitable[None]] | None = None
+        self._unsub_held_command_timeout: CALLBACK_TYPE | None = None
+
     @property
     def available(self) -> bool:
         # The library shows lights as non-ready when they are in certain states (like powering off)
         # but we can still query them for their state, so we report them as available
-        return self.equipment._omni.backyard.is_ready
+        return not self.coordinator.telemetry_expired and self.equipment._omni.backyard.is_ready
 
     @property
     def supported_color_modes(self) -> set[ColorMode]:
@@ -112,13 +130,8 @@ class OmniLogicLightEntity(OmniLogicEntity[ColorLogicLight, EntityIndexColorLogi
 
     # The "Any" below here isn't great, we should create a type for this later
     async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn the light on.
-
-        Example method how to request data updates.
-        """
+        """Turn the light on, or hold the command until the light is ready for it."""
         _LOGGER.debug("turning on light ID: %s, %s", self.system_id, kwargs)
-        if not self.equipment.is_ready:
-            raise HomeAssistantError("Light is in state %s and cannot be turned on yet, try again later." % self.equipment.state.pretty())
 
         # Map requested effect to omni show
         requested_effect = kwargs.get(ATTR_EFFECT, None)
@@ -126,45 +139,97 @@ class OmniLogicLightEntity(OmniLogicEntity[ColorLogicLight, EntityIndexColorLogi
             # We need to reformat the show name to match the enum keys
             request_show = self.equipment.effects[requested_effect.upper().replace(" ", "_")]
         else:
-            request_show = self.equipment.show
+            request_show = None
         _LOGGER.debug("Requested effect: %s, resolved to show: %s", requested_effect, request_show)
 
         # Map requested brightness to omni brightness
         requested_brightness = kwargs.get(ATTR_BRIGHTNESS, None)
         if requested_brightness is not None:
-            request_brightness = math.ceil(brightness_to_value(BRIGHTNESS_SCALE, requested_brightness))
+            request_brightness = ColorLogicBrightness(math.ceil(brightness_to_value(BRIGHTNESS_SCALE, requested_brightness)))
         else:
-            request_brightness = self.equipment.brightness
-        _LOGGER.debug(
-            "Requested brightness: %s, resolved to omni brightness: %s - %s",
-            requested_brightness,
-            request_brightness,
-            ColorLogicBrightness(request_brightness),
+            request_brightness = None
+        _LOGGER.debug("Requested brightness: %s, resolved to omni brightness: %s", requested_brightness, request_brightness)
+
+        # Whatever was not requested is left as the light has it when the command is sent
+        await self._async_send_when_ready(partial(self._async_set_show, request_show, request_brightness))
+
+    async def _async_set_show(self, show: LightShows | None, brightness: ColorLogicBrightness | None) -> None:
+        show = show if show is not None else self.equipment.show
+        brightness = brightness if brightness is not None else self.equipment.brightness
+        _LOGGER.debug("Setting light show to %s, speed %s, brightness %s", show, self.equipment.speed, brightness)
+        # The Home Assistant API has no concept of speed for a light, so we just use the current speed setting
+        # There is a number entity to control it though
+        await self.coordinator.omni_api.async_set_light_show(
+            self.bow_id, self.system_id, show, speed=self.equipment.speed, brightness=brightness
         )
 
-        _LOGGER.debug("Setting light show to %s, speed %s, brightness %s", request_show.pretty(), self.equipment.speed, request_brightness)
-
-        try:
-            await self.equipment.set_show(
-                show=request_show,
-                # The Home Assistant API has no concept of speed for a light, so we just use the current speed setting
-                # There is a number entity to control it though
-                speed=self.equipment.speed,
-                brightness=ColorLogicBrightness(request_brightness),
-            )
-        except OmniEquipmentNotInitializedError as exc:
-            raise HomeAssistantError("Light is not yet initialized, try again later.") from exc
-
-        async_call_later(self.hass, UPDATE_DELAY_SECONDS, self._schedule_refresh_callback)
+    async def _async_turn_off(self) -> None:
+        await self.coordinator.omni_api.async_set_equipment(self.bow_id, self.system_id, False)
 
     # The "Any" below here isn't great, we should create a type for this later
     async def async_turn_off(self, **kwargs: Any) -> None:
-        """Turn the light off.
+        """Turn the light off, or hold the command until the light is ready for it."""
+        await self._async_send_when_ready(self._async_turn_off)
+
+    async def _async_send_when_ready(self, command: Callable[[], Awaitable[None]]) -> None:
+        """Send a command if the light is ready for it, otherwise hold it in place of any command already held.
 
-        Example method how to request data updates.
+        Lights spend many seconds changing shows and powering on or off, during which they do not accept commands. Rather than have
+        scenes fail and automations retry, only the latest command is kept and it is sent once a poll shows the light is ready.
         """
-        if not self.equipment.is_ready:
-            raise HomeAssistantError("Light is in state %s and cannot be turned off yet, try again later." % self.equipment.state.pretty())
-        await self.equipment.turn_off()
+        if self.equipment.is_ready:
+            self._async_cancel_held_command()
+            await self._async_send(command)
+            return
+        _LOGGER.debug("light ID %s is in state %s, holding the command until it is ready", self.system_id, self.equipment.state.pretty())
+        self._async_cancel_held_command()
+        self._held_command = command
+        self._unsub_held_command_timeout = async_call_later(self.hass, LIGHT_READY_TIMEOUT_SECONDS, self._async_expire_held_command)
+        # Poll quickly so we notice the light becoming ready
+        self.coordinator.async_poll_fast(LIGHT_READY_TIMEOUT_SECONDS)
+
+    async def _async_send(self, command: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await command()
+        except OmniLogicAPIError as exc:
+            raise HomeAssistantError(f"Failed to send the command to light ID {self.system_id}: {exc}") from exc
+        self.coordinator.async_refresh_after_command()
+
+    async def _async_send_held_command(self, command: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await self._async_send(command)
+        except HomeAssistantError as exc:
+            _LOGGER.warning("Failed to send the command held for light ID %s: %s", self.system_id, exc)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_held_command)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        super()._handle_coordinator_update()
+        if self._held_command is not None and self.equipment.is_ready:
+            command = self._held_command
+            self._async_cancel_held_command()
+            _LOGGER.debug("light ID %s is ready, sending the command held for it", self.system_id)
+            self.coordinator.config_entry.async_create_background_task(
+                self.hass, self._async_send_held_command(command), name=f"{self.entity_id} held command"
+            )
+
+    @callback
+    def _async_expire_held_command(self, _now: datetime) -> None:
+        self._unsub_held_command_timeout = None
+        self._held_command = None
+        _LOGGER.warning(
+            "Dropped the command held for light ID %s, it was still in state %s after %ss",
+            self.system_id,
+            self.equipment.state.pretty(),
+            LIGHT_READY_TIMEOUT_SECONDS,
+        )
 
-        async_call_later(self.hass, UPDATE_DELAY_SECONDS, self._schedule_refresh_callback)
+    @callback
+    def _async_cancel_held_command(self) -> None:
+        self._held_command = None
+        if self._unsub_held_command_timeout is not None:
+            self._unsub_held_command_timeout()
+            self._unsub_held_command_timeout = None
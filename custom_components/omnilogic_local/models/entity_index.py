@@ -50,8 +50,10 @@ TelemetryTypes = (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityIndexData:
+    """A device in the entity index, created once per MSP config and re-bound to the latest telemetry on every poll."""
+
     msp_config: (
         MSPBackyard
         | MSPBoW
@@ -73,67 +75,120 @@ class EntityIndexData:
 EntityIndexT = dict[int, EntityIndexData]
 
 
+class EntityIndex(EntityIndexT):
+    """The entity index, keyed by system ID, along with secondary indexes that are maintained as entries are added.
+
+    The secondary indexes share their entries with the primary index, so callers must treat the returned buckets as read only.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.by_omni_type: dict[str, EntityIndexT] = {}
+        self.by_hass_type: dict[str, EntityIndexT] = {}
+        self.by_bow_id: dict[int, EntityIndexT] = {}
+        # Heater equipment keyed by the system ID of the sensor that it uses
+        self.heaters_by_sensor_id: dict[int, EntityIndexT] = {}
+
+    def add(self, entity: EntityIndexData, hass_type: str | None) -> None:
+        """Add an entry to the index and to each of the secondary indexes."""
+        system_id = entity.msp_config.system_id
+        self[system_id] = entity
+        self.by_omni_type.setdefault(entity.msp_config.omni_type, {})[system_id] = entity
+        if hass_type is not None:
+            self.by_hass_type.setdefault(hass_type, {})[system_id] = entity
+        self.by_bow_id.setdefault(entity.msp_config.bow_id, {})[system_id] = entity
+        if (sensor_id := getattr(entity.msp_config, "sensor_id", None)) is not None:
+            self.heaters_by_sensor_id.setdefault(sensor_id, {})[system_id] = entity
+
+
+# The typed entries below only narrow the annotations, the empty __slots__ keep them from growing a __dict__ of their own
 class EntityIndexBackyard(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPBackyard
     telemetry: TelemetryBackyard
 
 
 class EntityIndexBodyOfWater(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPBoW
     telemetry: TelemetryBoW
 
 
 class EntityIndexColorLogicLight(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPColorLogicLight
     telemetry: TelemetryColorLogicLight
 
 
 class EntityIndexFilter(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPFilter
     telemetry: TelemetryFilter
 
 
 class EntityIndexHeater(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPVirtualHeater
     telemetry: TelemetryVirtualHeater
 
 
 class EntityIndexHeaterEquip(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPHeaterEquip
     telemetry: TelemetryHeater
 
 
 class EntityIndexChlorinator(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPChlorinator
     telemetry: TelemetryChlorinator
 
 
 class EntityIndexCSAD(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPCSAD
     telemetry: TelemetryCSAD
 
 
 class EntityIndexChlorinatorEquip(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPChlorinatorEquip
     telemetry: TelemetryChlorinator
 
 
 class EntityIndexPump(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPPump
     telemetry: TelemetryPump
 
 
 class EntityIndexRelay(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPRelay
     telemetry: TelemetryRelay
 
 
 class EntityIndexSensor(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPSensor
     telemetry: None
 
 
 class EntityIndexValveActuator(EntityIndexData):
+    __slots__ = ()
+
     msp_config: MSPRelay
     telemetry: TelemetryValveActuator
 
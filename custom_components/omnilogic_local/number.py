@@ -5,7 +5,7 @@ from math import floor
 from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
 
 from homeassistant.components.number import NumberDeviceClass, NumberEntity, NumberMode
-from homeassistant.const import PERCENTAGE, UnitOfTemperature
+from homeassistant.const import PERCENTAGE, Platform, UnitOfTemperature
 from pyomnilogic_local import Chlorinator, Filter, Heater, Pump
 from pyomnilogic_local.omnitypes import (
     BodyOfWaterType,
@@ -20,9 +20,10 @@ from pyomnilogic_local.omnitypes import (
 )
 
 from .const import DOMAIN, KEY_COORDINATOR
-from .entity import OmniLogicEntity
+from .energy import FILTER_RUNNING_STATES
+from .entity import OmniLogicEntity, async_setup_entities
 from .models.entity_index import EntityIndexChlorinator, EntityIndexFilter, EntityIndexHeater, EntityIndexPump
-from .utils import get_entities_of_hass_type, get_entities_of_omni_types
+from .utils import get_entities_of_omni_types
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -37,12 +38,17 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the switch platform."""
-    coordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.NUMBER)
+
+
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[NumberEntity]:
+    """Build the number entities for the devices in the coordinator data."""
     _LOGGER.debug("Setting up number platform")
 
     filters_and_pumps = get_entities_of_omni_types(coordinator.data, [OmniType.FILTER, OmniType.PUMP])
 
-    entities = []
+    entities: list[NumberEntity] = []
     for system_id, pump in filters_and_pumps.items():
         _LOGGER.debug(
             "Configuring number for pump with ID: %s, Name: %s",
@@ -55,15 +61,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             case FilterType.VARIABLE_SPEED:
                 entities.append(OmniLogicFilterNumberEntity(coordinator=coordinator, context=system_id))
 
-    all_heaters = get_entities_of_hass_type(coordinator.data, "water_heater")
-    solar_heaters = {
-        system_id: data
-        for system_id, data in all_heaters.items()
-        if data.msp_config.omni_type == OmniType.HEATER_EQUIP and data.msp_config.heater_type is HeaterType.SOLAR
-    }
+    heater_equipment = get_entities_of_omni_types(coordinator.data, [OmniType.HEATER_EQUIP])
+    solar_heaters = {system_id: data for system_id, data in heater_equipment.items() if data.msp_config.heater_type is HeaterType.SOLAR}
 
     if solar_heaters:
-        virt_heaters = {system_id: data for system_id, data in all_heaters.items() if data.msp_config.omni_type == OmniType.VIRT_HEATER}
+        virt_heaters = get_entities_of_omni_types(coordinator.data, [OmniType.VIRT_HEATER])
 
         for system_id, vheater in virt_heaters.items():
             if vheater.msp_config.solar_set_point is not None:
@@ -102,7 +104,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
                 )
 
     _LOGGER.debug("Adding %s number entities", len(entities))
-    async_add_entities(entities)
+    return entities
 
 
 T = TypeVar("T", EntityIndexPump, EntityIndexFilter)
@@ -120,14 +122,14 @@ class OmniLogicVSPNumberEntity(OmniLogicEntity[Any, T], NumberEntity, Generic[T]
     """
 
     _attr_icon: str = "mdi:gauge"
+    _unique_id_suffix = "Speed"
 
     def __init__(self, coordinator: OmniLogicCoordinator, context: int) -> None:
         """Pass coordinator to CoordinatorEntity."""
         super().__init__(coordinator, context)
 
-    @property
-    def name(self) -> Any:
-        return f"{super().name} Speed"
+    def _build_name(self) -> Any:
+        return f"{super()._build_name()} Speed"
 
     @property
     def max_rpm(self) -> int:
@@ -211,6 +213,12 @@ class OmniLogicPumpNumberEntity(OmniLogicVSPNumberEntity[EntityIndexPump], OmniL
 class OmniLogicFilterNumberEntity(OmniLogicVSPNumberEntity[EntityIndexFilter], OmniLogicEntity[Filter, EntityIndexFilter]):
     """An OmniLogicFilterNumberEntity is a special case of an OmniLogicPumpNumberEntity."""
 
+    def _telemetry_matches(self, key: str, expected: Any, actual: Any) -> bool:
+        # A filter that is set to a speed may still be priming, or be running for another reason
+        if key == "state":
+            return (actual in FILTER_RUNNING_STATES) == (expected in FILTER_RUNNING_STATES)
+        return super()._telemetry_matches(key, expected, actual)
+
     async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
         if self.native_unit_of_measurement == "RPM":
@@ -254,6 +262,7 @@ class OmniLogicSolarSetPointNumberEntity(OmniLogicEntity[Heater, EntityIndexHeat
             unit=self.native_unit_of_measurement,
         )
         self.set_config({"solar_set_point": int(value)})
+        self.coordinator.async_refresh_after_command()
 
 
 class OmniLogicChlorinatorTimedPercentNumberEntity(OmniLogicEntity[Chlorinator, EntityIndexChlorinator], NumberEntity):
@@ -4,12 +4,24 @@ import logging
 from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar, cast
 
 from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
-from homeassistant.const import CONCENTRATION_PARTS_PER_MILLION, UnitOfPower, UnitOfTemperature
+from homeassistant.const import (
+    CONCENTRATION_PARTS_PER_MILLION,
+    EntityCategory,
+    Platform,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from pyomnilogic_local import CSAD, Chlorinator, Filter, Sensor
-from pyomnilogic_local.omnitypes import ChlorinatorDispenserType, CSADType, FilterState, HeaterType, OmniType, SensorType, SensorUnits
+from pyomnilogic_local.omnitypes import ChlorinatorDispenserType, CSADType, HeaterType, OmniType, SensorType, SensorUnits
 
-from .const import BACKYARD_SYSTEM_ID, DOMAIN, KEY_COORDINATOR
-from .entity import OmniLogicEntity
+from .const import BACKYARD_SYSTEM_ID, DOMAIN, KEY_COORDINATOR, MANUFACTURER, POLL_STATS_CONTEXT
+from .coordinator import OmniLogicCoordinator
+from .energy import filter_power
+from .entity import OmniLogicEntity, PublishPolicy, async_setup_entities
 from .models.entity_index import (
     EntityIndexBackyard,
     EntityIndexBodyOfWater,
@@ -19,7 +31,7 @@ from .models.entity_index import (
     EntityIndexHeaterEquip,
     EntityIndexSensor,
 )
-from .utils import get_entities_of_hass_type, get_entities_of_omni_types
+from .utils import backyard_identifier, get_entities_of_hass_type, get_entities_of_omni_types
 
 if TYPE_CHECKING:
     from datetime import date, datetime
@@ -30,19 +42,21 @@ if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import StateType
 
-    from .coordinator import OmniLogicCoordinator
-
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the switch platform."""
-    coordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.SENSOR)
+
 
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[SensorEntity]:
+    """Build the sensor entities for the devices in the coordinator data."""
     # Create a sensor entity for all temperature sensors
     all_sensors = get_entities_of_hass_type(coordinator.data, "sensor")
     _LOGGER.debug("Found %s sensor entities in coordinator data", len(all_sensors))
-    entities = []
+    entities: list[SensorEntity] = []
     for system_id, sensor in all_sensors.items():
         _LOGGER.debug("Processing sensor: SystemID=%s, Name=%s, Type=%s", system_id, sensor.msp_config.name, sensor.msp_config.equip_type)
         match sensor.msp_config.equip_type:
@@ -72,12 +86,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
                 # If a BoW has more than one solar temperature sensor, we need to only configure the sensors that are associated with actual
                 # solar heaters.
                 # We start by finding the solar heater that this sensor is associated with
-                omni_entities = get_entities_of_omni_types(coordinator.data, [OmniType.HEATER_EQUIP])
-                sensed_system_id = [
-                    k
-                    for k, v in omni_entities.items()
-                    if v.msp_config.heater_type is HeaterType.SOLAR and v.msp_config.sensor_id == sensor.msp_config.system_id
-                ]
+                sensing_heaters = coordinator.data.heaters_by_sensor_id.get(sensor.msp_config.system_id, {})
+                sensed_system_id = [k for k, v in sensing_heaters.items() if v.msp_config.heater_type is HeaterType.SOLAR]
                 # Then we decide what to do based on how many solar heaters we find
                 match len(sensed_system_id):
                     case 0:
@@ -124,6 +134,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
                     pump.msp_config.name,
                 )
                 entities.append(OmniLogicFilterEnergySensorEntity(coordinator=coordinator, context=system_id))
+                entities.append(OmniLogicFilterEnergyTotalSensorEntity(coordinator=coordinator, context=system_id))
 
     all_chlorinators = get_entities_of_omni_types(coordinator.data, [OmniType.CHLORINATOR])
     for system_id, chlorinator in all_chlorinators.items():
@@ -148,8 +159,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
                     "Your system has an unsupported chlorinator, please raise an issue: https://github.com/cryptk/haomnilogic-local/issues"
                 )
 
+    # Diagnostics about the polling itself, for tuning the scan interval and timeout
+    entities.extend(
+        [
+            OmniLogicPollDurationSensorEntity(coordinator, "last_duration", "Poll Duration"),
+            OmniLogicPollDurationSensorEntity(coordinator, "last_network", "Poll Network Time"),
+            OmniLogicPollDurationSensorEntity(coordinator, "last_parse", "Poll Parse Time"),
+            OmniLogicPollDurationSensorEntity(coordinator, "last_index", "Poll Index Time"),
+            OmniLogicPollDurationSensorEntity(coordinator, "last_fanout", "Poll Entity Update Time"),
+            OmniLogicPollDurationSensorEntity(coordinator, "last_loop_lag", "Poll Event Loop Lag"),
+            OmniLogicPollCountSensorEntity(coordinator, "timeouts", "Poll Timeouts"),
+            OmniLogicPollCountSensorEntity(coordinator, "errors", "Poll Errors"),
+            OmniLogicLastPollSensorEntity(coordinator, "last_success", "Last Successful Poll"),
+        ]
+    )
+
     _LOGGER.debug("Adding %s sensor entities", len(entities))
-    async_add_entities(entities)
+    return entities
 
 
 T = TypeVar("T", EntityIndexBackyard, EntityIndexBodyOfWater, EntityIndexHeaterEquip)
@@ -177,8 +203,10 @@ class OmniLogicTemperatureSensorEntity(OmniLogicEntity[Sensor, EntityIndexSensor
         self.sensed_type = sensed_type
 
     @property
-    def sensed_data(self) -> T:
-        return cast("T", self.coordinator.data[self.sensed_system_id])
+    def sensed_data(self) -> T | None:
+        if (sensed_system_id := self.sensed_system_id) is None:
+            return None
+        return cast("T", self.coordinator.data[sensed_system_id])
 
     @property
     def sensed_system_id(self) -> int | None:
@@ -197,6 +225,10 @@ class OmniLogicTemperatureSensorEntity(OmniLogicEntity[Sensor, EntityIndexSensor
             self._sensed_system_id_error_logged = True
         return None
 
+    @property
+    def related_system_ids(self) -> set[int]:
+        return {self.sensed_system_id} if self.sensed_system_id is not None else set()
+
     @property
     def native_unit_of_measurement(self) -> str | None:
         match self.data.msp_config.units:
@@ -219,9 +251,9 @@ class OmniLogicAirTemperatureSensorEntity(OmniLogicTemperatureSensorEntity[Entit
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        if self.sensed_system_id is None or self.sensed_data.telemetry is None:
+        if (sensed_data := self.sensed_data) is None or sensed_data.telemetry is None:
             return None
-        temp = self.sensed_data.telemetry.air_temp
+        temp = sensed_data.telemetry.air_temp
         return temp if temp not in [-1, 255, 65535] else None
 
 
@@ -231,30 +263,34 @@ class OmniLogicWaterTemperatureSensorEntity(OmniLogicTemperatureSensorEntity[Ent
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        if self.sensed_system_id is None:
-            _LOGGER.debug("Water Temp Sensor %s: Sensed System ID is None", self.entity_id)
+        tracing = self.coordinator.trace and _LOGGER.isEnabledFor(logging.DEBUG)
+        if (sensed_data := self.sensed_data) is None:
+            if tracing:
+                _LOGGER.debug("Water Temp Sensor %s: Sensed System ID is None", self.entity_id)
             return None
 
         # DEBUG: Trace the telemetry link
-        if self.sensed_data.telemetry is None:
+        if sensed_data.telemetry is None:
             _LOGGER.warning(
                 "Water Temp Sensor %s: Telemetry is None for system_id %s (Data Type: %s)",
                 self.entity_id,
                 self.sensed_system_id,
-                type(self.sensed_data),
+                type(sensed_data),
             )
             return None
 
-        _LOGGER.debug(
-            "Water Temp Sensor %s (SystemID: %s): Inspecting Telemetry: %s",
-            self.entity_id,
-            self.sensed_system_id,
-            self.sensed_data.telemetry,
-        )
+        if tracing:
+            _LOGGER.debug(
+                "Water Temp Sensor %s (SystemID: %s): Inspecting Telemetry: %s",
+                self.entity_id,
+                self.sensed_system_id,
+                sensed_data.telemetry,
+            )
 
-        temp = self.sensed_data.telemetry.water_temp
+        temp = sensed_data.telemetry.water_temp
         if temp in [-1, 255, 65535]:
-            _LOGGER.debug("Water Temp Sensor %s: Invalid temp value %s", self.entity_id, temp)
+            if tracing:
+                _LOGGER.debug("Water Temp Sensor %s: Invalid temp value %s", self.entity_id, temp)
             return None
 
         return temp
@@ -267,9 +303,9 @@ class OmniLogicSolarTemperatureSensorEntity(OmniLogicTemperatureSensorEntity[Ent
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
-        if self.sensed_system_id is None or self.sensed_data.telemetry is None:
+        if (sensed_data := self.sensed_data) is None or sensed_data.telemetry is None:
             return None
-        temp = self.sensed_data.telemetry.temp
+        temp = sensed_data.telemetry.temp
         return temp if temp not in [-1, 255, 65535] else None
 
 
@@ -277,38 +313,55 @@ class OmniLogicFilterEnergySensorEntity(OmniLogicEntity[Filter, EntityIndexFilte
     _attr_device_class = SensorDeviceClass.POWER
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_state_class = SensorStateClass.MEASUREMENT
+    # The reported power wanders by a few watts at a constant speed, a speed change moves it by far more than this
+    _publish_policy = PublishPolicy(absolute=10, relative=0.05, min_interval=60)
+    _unique_id_suffix = "Power"
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
         if self.data.telemetry is None:
             return None
-        return (
-            self.data.telemetry.power
-            if self.data.telemetry.state
-            in [
-                FilterState.ON,
-                FilterState.PRIMING,
-                FilterState.HEATER_EXTEND,
-                FilterState.CSAD_EXTEND,
-                FilterState.FILTER_FORCE_PRIMING,
-                FilterState.FILTER_SUPERCHLORINATE,
-            ]
-            else 0
-        )
+        return filter_power(self.data.telemetry)
 
-    @property
-    def name(self) -> Any:
+    def _build_name(self) -> Any:
         return f"{self.data.msp_config.name} Power"
 
 
+class OmniLogicFilterEnergyTotalSensorEntity(OmniLogicEntity[Filter, EntityIndexFilter], SensorEntity):
+    """The energy a filter has used, accumulated by the coordinator from the power it reports on each poll."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 2
+    _unique_id_suffix = "Energy"
+    # Written every 10 Wh rather than on every poll while the filter runs
+    _publish_policy = PublishPolicy(absolute=0.01)
+
+    def __init__(self, coordinator: OmniLogicCoordinator, context: int) -> None:
+        super().__init__(coordinator, context)
+        # The total grows on every poll while the filter runs, not only when its telemetry changes
+        self.coordinator_context = None
+
+    @property
+    def native_value(self) -> StateType | date | datetime | Decimal:
+        return round(self.coordinator.energy.totals.get(self.system_id, 0.0), 3)
+
+    def _build_name(self) -> Any:
+        return f"{self.data.msp_config.name} Energy"
+
+
 class OmniLogicChlorinatorSaltLevelSensorEntity(OmniLogicEntity[Chlorinator, EntityIndexChlorinator], SensorEntity):
     _attr_native_unit_of_measurement = CONCENTRATION_PARTS_PER_MILLION
     _attr_state_class = SensorStateClass.MEASUREMENT
+    # The instant salt level jitters by tens of ppm from one poll to the next, and nothing needs it more often than every few minutes
+    _publish_policy = PublishPolicy(absolute=50, min_interval=300)
     _sensor_type: Literal["average", "instant"]
 
     def __init__(self, coordinator: OmniLogicCoordinator, context: int, sensor_type: Literal["average", "instant"]) -> None:
         super().__init__(coordinator, context)
         self._sensor_type = sensor_type
+        self._unique_id_suffix = f"{sensor_type.capitalize()} Salt Level"
 
     @property
     def native_value(self) -> StateType | date | datetime | Decimal:
@@ -320,14 +373,14 @@ class OmniLogicChlorinatorSaltLevelSensorEntity(OmniLogicEntity[Chlorinator, Ent
             case "instant":
                 return self.data.telemetry.instant_salt_level
 
-    @property
-    def name(self) -> Any:
+    def _build_name(self) -> Any:
         return f"{self.data.msp_config.name} {self._sensor_type.capitalize()} Salt Level"
 
 
 class OmniLogicCSADSensorEntity(OmniLogicEntity[CSAD, EntityIndexCSAD], SensorEntity):
     _attr_device_class = SensorDeviceClass.PH
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _publish_policy = PublishPolicy(absolute=0.05, min_interval=300)
 
     def __init__(self, coordinator: OmniLogicCoordinator, context: int) -> None:
         super().__init__(coordinator, context)
@@ -357,6 +410,8 @@ class OmniLogicCSADSensorEntity(OmniLogicEntity[CSAD, EntityIndexCSAD], SensorEn
 class OmniLogicCSADAcidORPEntity(OmniLogicEntity[CSAD, EntityIndexCSAD], SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_name = "ORP"
+    # In millivolts
+    _publish_policy = PublishPolicy(absolute=10, min_interval=300)
 
     def __init__(self, coordinator: OmniLogicCoordinator, context: int) -> None:
         super().__init__(coordinator, context)
@@ -380,3 +435,53 @@ class OmniLogicCSADAcidORPEntity(OmniLogicEntity[CSAD, EntityIndexCSAD], SensorE
             "forced_on_time": self.data.msp_config.orp_forced_on_time,
             "forced_enabled": self.data.msp_config.orp_forced_enabled,
         }
+
+
+class OmniLogicPollSensorEntity(CoordinatorEntity[OmniLogicCoordinator], SensorEntity):
+    """A diagnostic sensor on the backyard device reporting one of the coordinator's poll statistics."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: OmniLogicCoordinator, stat: str, name: str, enabled_default: bool = False) -> None:
+        # Updated after every poll, not only those where some telemetry changed, and after the other entities so the fan-out is timed
+        super().__init__(coordinator, POLL_STATS_CONTEXT)
+        self._stat = stat
+        self._attr_name = name
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id} {BACKYARD_SYSTEM_ID} poll {stat}"
+        self._attr_entity_registry_enabled_default = enabled_default
+        self._attr_device_info = DeviceInfo(identifiers={backyard_identifier(coordinator.config_entry.entry_id)}, manufacturer=MANUFACTURER)
+
+    @property
+    def available(self) -> bool:
+        # These are most interesting exactly when polling is failing
+        return True
+
+    @property
+    def native_value(self) -> StateType | date | datetime | Decimal:
+        return cast("StateType | datetime", getattr(self.coordinator.poll_stats, self._stat))
+
+
+class OmniLogicPollDurationSensorEntity(OmniLogicPollSensorEntity):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+
+    @property
+    def native_value(self) -> StateType | date | datetime | Decimal:
+        seconds = getattr(self.coordinator.poll_stats, self._stat)
+        return seconds * 1000 if seconds is not None else None
+
+
+class OmniLogicPollCountSensorEntity(OmniLogicPollSensorEntity):
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        stats = self.coordinator.poll_stats
+        return {"polls": stats.polls, "consecutive_failures": stats.consecutive_failures, "last_error": stats.last_error}
+
+
+class OmniLogicLastPollSensorEntity(OmniLogicPollSensorEntity):
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
@@ -0,0 +1,76 @@
+"""Services for the OmniLogic Local integration."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+
+from .const import DOMAIN, KEY_COORDINATOR
+from .errors import OmniLogicError
+
+if TYPE_CHECKING:
+    from .coordinator import OmniLogicCoordinator
+
+SERVICE_REFRESH_CONFIG = "refresh_config"
+SERVICE_APPLY_STATE = "apply_state"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_TARGETS = "targets"
+
+REFRESH_CONFIG_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+APPLY_STATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required("system_id"): vol.Coerce(int),
+                        vol.Optional("state"): cv.boolean,
+                        vol.Optional("speed"): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                        vol.Optional("show"): cv.string,
+                    }
+                )
+            ],
+        ),
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant, entry_id: str | None) -> list[OmniLogicCoordinator]:
+    """The coordinators of the loaded config entries, or just the one for entry_id if it is given."""
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED and entry_id in (None, entry.entry_id)
+    ]
+    if entry_id is not None and not entries:
+        msg = f"No loaded OmniLogic with config entry ID {entry_id}"
+        raise OmniLogicError(msg)
+    return [hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR] for entry in entries]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_refresh_config(call: ServiceCall) -> None:
+        coordinators = _coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        await asyncio.gather(*(coordinator.async_refresh_config() for coordinator in coordinators))
+
+    async def _async_apply_state(call: ServiceCall) -> ServiceResponse:
+        coordinators = _coordinators(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        if len(coordinators) != 1:
+            msg = "Choose which OmniLogic to apply the state to with config_entry_id"
+            raise OmniLogicError(msg)
+        return await coordinators[0].async_apply_state(call.data[ATTR_TARGETS])
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH_CONFIG, _async_refresh_config, schema=REFRESH_CONFIG_SCHEMA)
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_STATE, _async_apply_state, schema=APPLY_STATE_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
@@ -4,6 +4,7 @@ import logging
 from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.const import Platform
 from pyomnilogic_local import Bow, Chlorinator, Filter, Pump, Relay
 from pyomnilogic_local.omnitypes import (
     BodyOfWaterType,
@@ -18,7 +19,8 @@ from pyomnilogic_local.omnitypes import (
 )
 
 from .const import DOMAIN, KEY_COORDINATOR
-from .entity import OmniLogicEntity
+from .energy import FILTER_RUNNING_STATES
+from .entity import OmniLogicEntity, async_setup_entities
 from .models.entity_index import (
     EntityIndexBodyOfWater,
     EntityIndexChlorinator,
@@ -43,8 +45,13 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the switch platform."""
-    entities = []
-    coordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.SWITCH)
+
+
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[SwitchEntity]:
+    """Build the switch entities for the devices in the coordinator data."""
+    entities: list[SwitchEntity] = []
     all_switches = get_entities_of_hass_type(coordinator.data, "switch")
     _LOGGER.debug("Found %s switch entities in coordinator data", len(all_switches))
 
@@ -97,9 +104,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
                     entities.append(OmniLogicSpilloverSwitchEntity(coordinator=coordinator, context=system_id))
 
     _LOGGER.debug("Adding %s switch entities", len(entities))
-    async_add_entities(entities)
+    return entities
 
 
+# Valve actuators driving one of these features get its icon, any others show whether the valve is open
+RELAY_FUNCTION_ICONS: dict[RelayFunction, str] = {
+    RelayFunction.WATERFALL: "mdi:waterfall",
+    RelayFunction.FOUNTAIN: "mdi:fountain",
+    RelayFunction.WATER_FEATURE: "mdi:fountain",
+    RelayFunction.WATER_SLIDE: "mdi:slide",
+    RelayFunction.LAMINARS: "mdi:light",
+    RelayFunction.LIGHT: "mdi:light",
+    RelayFunction.BACKYARD_LIGHT: "mdi:light",
+}
+
 T = TypeVar("T", EntityIndexRelay, EntityIndexFilter, EntityIndexPump, EntityIndexValveActuator)
 
 
@@ -150,23 +168,11 @@ class OmniLogicRelayValveActuatorSwitchEntity(
 
     @property
     def icon(self) -> str | None:
-        match self.data.msp_config.function:
-            case RelayFunction.WATERFALL:
-                return "mdi:waterfall"
-            case RelayFunction.FOUNTAIN:
-                return "mdi:fountain"
-            case RelayFunction.WATER_FEATURE:
-                return "mdi:fountain"
-            case RelayFunction.WATER_SLIDE:
-                return "mdi:slide"
-            case RelayFunction.LAMINARS:
-                return "mdi:light"
-            case RelayFunction.LIGHT:
-                return "mdi:light"
-            case RelayFunction.BACKYARD_LIGHT:
-                return "mdi:light"
-            case _:
-                return "mdi:valve-open" if self.is_on else "mdi:valve-closed"
+        if "function_icon" not in self._static_properties:
+            self._static_properties["function_icon"] = RELAY_FUNCTION_ICONS.get(self.data.msp_config.function)
+        if (icon := self._static_properties["function_icon"]) is not None:
+            return cast("str", icon)
+        return "mdi:valve-open" if self.is_on else "mdi:valve-closed"
 
     @property
     def extra_state_attributes(self) -> dict[str, int | str]:
@@ -242,14 +248,13 @@ class OmniLogicFilterSwitchEntity(OmniLogicSwitchEntity[EntityIndexFilter], Omni
 
     @property
     def is_on(self) -> bool | None:
-        return self.data.telemetry.state in [
-            FilterState.ON,
-            FilterState.PRIMING,
-            FilterState.HEATER_EXTEND,
-            FilterState.CSAD_EXTEND,
-            FilterState.FILTER_FORCE_PRIMING,
-            FilterState.FILTER_SUPERCHLORINATE,
-        ]
+        return self.data.telemetry.state in FILTER_RUNNING_STATES
+
+    def _telemetry_matches(self, key: str, expected: Any, actual: Any) -> bool:
+        # A filter that is turned on primes first, or may already be running for another reason
+        if key == "state":
+            return (actual in FILTER_RUNNING_STATES) == (expected in FILTER_RUNNING_STATES)
+        return super()._telemetry_matches(key, expected, actual)
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
@@ -322,11 +327,13 @@ class OmniLogicSpilloverSwitchEntity(OmniLogicEntity[Bow, EntityIndexBodyOfWater
         super().__init__(coordinator, context)
         # This is all a little gross, and it means that we can only support one filter system per BoW, but I believe that is a limitation of
         # the Omni system anyway.  They can have multiple pumps, but only one "filter"
-        all_filters = get_entities_of_omni_types(coordinator.data, [OmniType.FILTER])
-        bow_filter = {
-            system_id: bow_filter for (system_id, bow_filter) in all_filters.items() if bow_filter.msp_config.bow_id == self.bow_id
-        }
-        self.filter_system_id = list(bow_filter.keys())[0]
+        bow_devices = coordinator.data.by_bow_id.get(self.bow_id, {})
+        bow_filter = [system_id for (system_id, device) in bow_devices.items() if device.msp_config.omni_type == OmniType.FILTER]
+        self.filter_system_id = bow_filter[0]
+
+    @property
+    def related_system_ids(self) -> set[int]:
+        return {self.filter_system_id}
 
     @property
     def icon(self) -> str | None:
@@ -342,8 +349,10 @@ class OmniLogicSpilloverSwitchEntity(OmniLogicEntity[Bow, EntityIndexBodyOfWater
         """Turn the entity on."""
         _LOGGER.debug("turning on spillover ID: %s", self.system_id)
         await self.coordinator.omni_api.async_set_spillover(self.bow_id, 75)
+        self.coordinator.async_refresh_after_command()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
         _LOGGER.debug("turning off spillover ID: %s", self.system_id)
         await self.coordinator.omni_api.async_set_spillover(self.bow_id, 0)
+        self.coordinator.async_refresh_after_command()
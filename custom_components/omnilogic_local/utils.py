@@ -1,68 +1,110 @@
 from __future__ import annotations
 
 import logging
+import weakref
 from typing import TYPE_CHECKING
 
 from pyomnilogic_local.models.mspconfig import MSPConfig, OmniBase
 from pyomnilogic_local.omnitypes import OmniType
 
-from .const import OMNI_TO_HASS_TYPES
+from .const import BACKYARD_SYSTEM_ID, DOMAIN
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-    from .models.entity_index import EntityIndexT
+    from collections.abc import Iterable, Iterator
+
+    from pyomnilogic_local.models.telemetry import Telemetry
+
+    from .models.entity_index import EntityIndex, EntityIndexT, TelemetryTypes
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Flattened device lists from device_walk, keyed on the identity of the config (and bow_id) they were walked from. Entries are dropped
+# when the config object they belong to is garbage collected.
+_DEVICE_WALK_CACHE: dict[tuple[int, int], list[OmniBase]] = {}
+
+
 def device_walk(base: OmniBase | MSPConfig, bow_id: int = -1) -> Iterable[OmniBase]:
-    """Walk the OmniLogic device tree and yield individual devices with their bow_id."""
+    """Walk the OmniLogic device tree and return the individual devices with their bow_id.
+
+    The walk is only performed once per config object, subsequent calls return the cached (shared, so do not modify it) device list.
+    """
+    key = (id(base), bow_id)
+    if (devices := _DEVICE_WALK_CACHE.get(key)) is None:
+        devices = _device_walk(base, bow_id)
+        _DEVICE_WALK_CACHE[key] = devices
+        weakref.finalize(base, _DEVICE_WALK_CACHE.pop, key, None)
+    return devices
+
+
+def _child_devices(base: OmniBase | MSPConfig) -> Iterator[OmniBase]:
     for _key, value in base:
-        if isinstance(value, OmniBase) and hasattr(value, "system_id"):
-            device = value.without_subdevices()
-            if bow_id != -1 and getattr(device, "bow_id", -1) == -1:
-                device.bow_id = bow_id
+        if isinstance(value, list):
+            yield from (item for item in value if isinstance(item, OmniBase) and hasattr(item, "system_id"))
+        elif isinstance(value, OmniBase) and hasattr(value, "system_id"):
+            yield value
+
+
+def _device_walk(base: OmniBase | MSPConfig, bow_id: int) -> list[OmniBase]:
+    devices: list[OmniBase] = []
+    # Depth first, with an explicit stack of (remaining children, bow_id of those children) instead of recursion
+    stack = [(_child_devices(base), bow_id)]
+    while stack:
+        children, parent_bow_id = stack[-1]
+        if (value := next(children, None)) is None:
+            stack.pop()
+            continue
+        device = value.without_subdevices()
+        if parent_bow_id != -1 and getattr(device, "bow_id", -1) == -1:
+            device.bow_id = parent_bow_id
+        devices.append(device)
+        stack.append((_child_devices(value), value.system_id if value.omni_type == OmniType.BOW else parent_bow_id))
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        for device in devices:
             _LOGGER.debug(
                 "device_walk found device: %s (Type: %s, SystemID: %s, BOW ID: %s)",
-                device.name if hasattr(device, "name") else "Unnamed",
+                getattr(device, "name", "Unnamed"),
                 device.omni_type,
                 device.system_id,
                 device.bow_id,
             )
-            yield device
-
-            child_bow_id = value.system_id if value.omni_type == OmniType.BOW else bow_id
-            yield from device_walk(value, child_bow_id)
-        elif isinstance(value, list):
-            for item in value:
-                if isinstance(item, OmniBase) and hasattr(item, "system_id"):
-                    device = item.without_subdevices()
-                    if bow_id != -1 and getattr(device, "bow_id", -1) == -1:
-                        device.bow_id = bow_id
-                    _LOGGER.debug(
-                        "device_walk found device from list: %s (Type: %s, SystemID: %s, BOW ID: %s)",
-                        device.name if hasattr(device, "name") else "Unnamed",
-                        device.omni_type,
-                        device.system_id,
-                        device.bow_id,
-                    )
-                    yield device
-
-                    child_bow_id = item.system_id if item.omni_type == OmniType.BOW else bow_id
-                    yield from device_walk(item, child_bow_id)
-
-
-def get_entities_of_hass_type(entities: EntityIndexT, hass_type: str) -> EntityIndexT:
-    found = {}
-    for system_id, entity in entities.items():
-        if OMNI_TO_HASS_TYPES[entity.msp_config.omni_type] == hass_type:
-            found[system_id] = entity
+    return devices
+
+
+def backyard_identifier(entry_id: str) -> tuple[str, str]:
+    """The device registry identifier of the backyard of the controller configured by a config entry."""
+    return (DOMAIN, f"{entry_id}_backyard_{BACKYARD_SYSTEM_ID}")
+
+
+def bow_identifier(entry_id: str, bow_id: int) -> tuple[str, str]:
+    """The device registry identifier of a body of water of the controller configured by a config entry."""
+    return (DOMAIN, f"{entry_id}_bow_{bow_id}")
+
+
+def telemetry_by_system_id(telemetry: Telemetry) -> dict[int, TelemetryTypes]:
+    """Flatten a telemetry snapshot into a mapping of system_id to that device's telemetry.
+
+    Telemetry.get_telem_by_systemid scans every telemetry list on each call, building this mapping once per poll lets us bind
+    telemetry to the whole entity index in a single pass.
+    """
+    found: dict[int, TelemetryTypes] = {}
+    for field_name, value in telemetry:
+        if field_name == "version" or value is None:
+            continue
+        for model in value if isinstance(value, list) else [value]:
+            found.setdefault(model.system_id, model)
     return found
 
 
-def get_entities_of_omni_types(entities: EntityIndexT, omni_types: list[OmniType]) -> EntityIndexT:
-    found = {}
-    for system_id, entity in entities.items():
-        if entity.msp_config.omni_type in omni_types:
-            found[system_id] = entity
+def get_entities_of_hass_type(entities: EntityIndex, hass_type: str) -> EntityIndexT:
+    return entities.by_hass_type.get(hass_type, {})
+
+
+def get_entities_of_omni_types(entities: EntityIndex, omni_types: list[OmniType]) -> EntityIndexT:
+    if len(omni_types) == 1:
+        return entities.by_omni_type.get(omni_types[0], {})
+    found: EntityIndexT = {}
+    for omni_type in omni_types:
+        found.update(entities.by_omni_type.get(omni_type, {}))
     return found
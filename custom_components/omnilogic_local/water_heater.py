@@ -4,14 +4,14 @@ import logging
 from typing import TYPE_CHECKING, Any, Literal, cast
 
 from homeassistant.components.water_heater import WaterHeaterEntity, WaterHeaterEntityFeature
-from homeassistant.const import ATTR_TEMPERATURE, STATE_OFF, STATE_ON, UnitOfTemperature
+from homeassistant.const import ATTR_TEMPERATURE, STATE_OFF, STATE_ON, Platform, UnitOfTemperature
 from pyomnilogic_local import Heater
 from pyomnilogic_local.omnitypes import OmniType
 
 from .const import DOMAIN, KEY_COORDINATOR
-from .entity import OmniLogicEntity
+from .entity import OmniLogicEntity, async_setup_entities
 from .models.entity_index import EntityIndexHeater
-from .utils import get_entities_of_hass_type
+from .utils import get_entities_of_omni_types
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -27,14 +27,16 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the water heater platform."""
-    coordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    coordinator: OmniLogicCoordinator = hass.data[DOMAIN][entry.entry_id][KEY_COORDINATOR]
+    await async_setup_entities(coordinator, entry, async_add_entities, _build_entities, Platform.WATER_HEATER)
 
-    all_heaters = get_entities_of_hass_type(coordinator.data, "water_heater")
 
-    virtual_heater = {system_id: data for system_id, data in all_heaters.items() if data.msp_config.omni_type == OmniType.VIRT_HEATER}
-    heater_equipment_ids = [system_id for system_id, data in all_heaters.items() if data.msp_config.omni_type == OmniType.HEATER_EQUIP]
+def _build_entities(coordinator: OmniLogicCoordinator) -> list[WaterHeaterEntity]:
+    """Build the water heater entities for the devices in the coordinator data."""
+    virtual_heater = get_entities_of_omni_types(coordinator.data, [OmniType.VIRT_HEATER])
+    heater_equipment_ids = list(get_entities_of_omni_types(coordinator.data, [OmniType.HEATER_EQUIP]))
 
-    entities = []
+    entities: list[WaterHeaterEntity] = []
     for system_id, vheater in virtual_heater.items():
         _LOGGER.debug(
             "Configuring water heater with ID: %s, Name: %s",
@@ -49,7 +51,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
         )
 
-    async_add_entities(entities)
+    return entities
 
 
 class OmniLogicWaterHeaterEntity(OmniLogicEntity[Heater, EntityIndexHeater], WaterHeaterEntity):
@@ -77,6 +79,10 @@ class OmniLogicWaterHeaterEntity(OmniLogicEntity[Heater, EntityIndexHeater], Wat
         )
         self.heater_equipment_ids = heater_equipment_ids
 
+    @property
+    def related_system_ids(self) -> set[int]:
+        return {self.bow_id, *self.heater_equipment_ids}
+
     @property
     def temperature_unit(self) -> str:
         # Heaters always return their values in Fahrenheit, no matter what units the system is set to
@@ -117,10 +123,10 @@ class OmniLogicWaterHeaterEntity(OmniLogicEntity[Heater, EntityIndexHeater], Wat
         match operation_mode:
             case "on":
                 await self.coordinator.omni_api.async_set_heater_enable(self.bow_id, self.system_id, True)
-                self.set_telemetry({"enabled": "yes"})
+                self.set_telemetry({"enabled": True})
             case "off":
                 await self.coordinator.omni_api.async_set_heater_enable(self.bow_id, self.system_id, False)
-                self.set_telemetry({"enabled": "no"})
+                self.set_telemetry({"enabled": False})
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self.async_set_operation_mode("on")
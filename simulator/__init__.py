@@ -0,0 +1,11 @@
+"""A local simulator of the OmniLogic controller's UDP protocol.
+
+It serves the MSP config and telemetry from a diagnostics download of the integration (or a synthetic pool), applies the commands it
+receives to that telemetry, and can add latency and packet loss, so the integration can be exercised without a physical controller.
+Run it with `python -m simulator --help`.
+"""
+
+from .controller import SimulatedController
+from .server import NetworkConditions, SimulatorProtocol, async_serve
+
+__all__ = ["NetworkConditions", "SimulatedController", "SimulatorProtocol", "async_serve"]
@@ -0,0 +1,58 @@
+"""Run a simulated OmniLogic controller, e.g. `python -m simulator diagnostics.json --loss 0.05 --latency 0.1`."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from benchmarks.synthetic import build_mspconfig_xml, build_telemetry_xml
+
+from .controller import SimulatedController
+from .server import NetworkConditions, async_serve
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m simulator", description=__doc__)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("diagnostics", nargs="?", type=Path, help="a diagnostics download from the OmniLogic Local integration")
+    source.add_argument("--synthetic", type=int, metavar="DEVICES", help="serve a generated config with roughly this many devices")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=10444)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay every datagram we send")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many seconds of random extra delay")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability of dropping each datagram, in either direction")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser.parse_args()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    if args.synthetic is not None:
+        controller = SimulatedController(build_mspconfig_xml(args.synthetic), build_telemetry_xml(args.synthetic))
+    else:
+        controller = SimulatedController.from_diagnostics(args.diagnostics)
+
+    conditions = NetworkConditions(latency=args.latency, jitter=args.jitter, loss=args.loss)
+    transport, protocol = await async_serve(controller, args.host, args.port, conditions)
+    _LOGGER.info("Simulating an OmniLogic controller on %s:%s with %s", args.host, args.port, conditions)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+        _LOGGER.info("Handled %s, dropped %s datagrams", dict(protocol.requests), protocol.dropped)
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""The state of a simulated OmniLogic controller, and how commands change it."""
+
+from __future__ import annotations
+
+import json
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pyomnilogic_local.api.constants import XML_NAMESPACE
+from pyomnilogic_local.omnitypes import ColorLogicPowerState, FilterValvePosition, MessageType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+_NS = f"{{{XML_NAMESPACE}}}"
+
+
+def _local_name(tag: str) -> str:
+    """Strip any XML namespace from a tag, the config and telemetry documents may or may not declare one."""
+    return tag.rpartition("}")[2]
+
+
+class SimulatedController:
+    """Serves an MSP config and telemetry, and applies the commands it receives to that telemetry."""
+
+    def __init__(self, mspconfig: str, telemetry: str) -> None:
+        self.mspconfig = mspconfig
+        self._telemetry = ET.fromstring(telemetry)
+        self._devices: dict[int, ET.Element] = {
+            int(element.attrib["systemId"]): element for element in self._telemetry if "systemId" in element.attrib
+        }
+        # Some commands only address a body of water, so we need to know which devices belong to which
+        self._bow_devices: dict[int, set[int]] = {}
+        for bow in ET.fromstring(mspconfig).iter():
+            if _local_name(bow.tag) != "Body-of-water":
+                continue
+            system_ids = [int(child.text) for child in bow.iter() if _local_name(child.tag) == "System-Id" and child.text]
+            self._bow_devices[system_ids[0]] = set(system_ids[1:])
+        self._handlers: dict[str, Callable[[dict[str, int]], None]] = {
+            "SetUIEquipmentCmd": self._set_equipment,
+            "SetUIFilterSpeedCmd": self._set_filter_speed,
+            "SetUIHeaterCmd": self._set_heater,
+            "SetUISolarSetPointCmd": self._set_solar_set_point,
+            "SetUIHeaterModeCmd": self._set_heater_mode,
+            "SetHeaterEnable": self._set_heater_enable,
+            "SetCHLOREnable": self._set_chlorinator_enable,
+            "SetCHLORParams": self._set_chlorinator_params,
+            "SetStandAloneLightShow": self._set_light_show,
+            "SetUISpilloverCmd": self._set_spillover,
+        }
+
+    @classmethod
+    def from_diagnostics(cls, path: Path) -> SimulatedController:
+        """Load a controller from a diagnostics download of the integration."""
+        diagnostics = json.loads(path.read_text())
+        # Downloads from Home Assistant wrap our diagnostics in a "data" key, accept the bare dict as well
+        data = diagnostics.get("data", diagnostics)
+        return cls(data["msp_config"], data["telemetry"])
+
+    @property
+    def telemetry(self) -> str:
+        return '<?xml version="1.0" encoding="UTF-8" ?>' + ET.tostring(self._telemetry, encoding="unicode")
+
+    def handle_request(self, msg_type: MessageType, payload: str) -> tuple[MessageType, str] | None:
+        """Handle a request, returning the response type and body if the request expects one."""
+        match msg_type:
+            case MessageType.REQUEST_CONFIGURATION:
+                return MessageType.MSP_CONFIGURATIONUPDATE, self.mspconfig
+            case MessageType.GET_TELEMETRY:
+                return MessageType.MSP_TELEMETRY_UPDATE, self.telemetry
+
+        request = ET.fromstring(payload)
+        name = request.findtext(f"{_NS}Name", "")
+        params = {
+            param.attrib["name"]: int(param.text or 0)
+            for param in request.iter(f"{_NS}Parameter")
+            if (param.text or "0").lstrip("-").isdigit()
+        }
+        if (handler := self._handlers.get(name)) is None:
+            _LOGGER.info("ignoring unsupported %s command: %s", name, params)
+            return None
+        _LOGGER.info("applying %s command: %s", name, params)
+        handler(params)
+        return None
+
+    def _device(self, system_id: int, *tags: str) -> ET.Element | None:
+        element = self._devices.get(system_id)
+        if element is None or (tags and _local_name(element.tag) not in tags):
+            _LOGGER.warning("no %s with system ID %s in the telemetry", "/".join(tags) or "device", system_id)
+            return None
+        return element
+
+    def _bow_device(self, bow_id: int, tag: str) -> ET.Element | None:
+        for system_id in self._bow_devices.get(bow_id, ()):
+            if (element := self._devices.get(system_id)) is not None and _local_name(element.tag) == tag:
+                return element
+        _LOGGER.warning("no %s in body of water %s", tag, bow_id)
+        return None
+
+    @staticmethod
+    def _set_speed(element: ET.Element, state: str, speed_attrs: tuple[str, ...], value: int) -> None:
+        # Variable speed equipment takes a speed percentage, everything else takes on/off
+        speed = value if value > 1 else int(element.get("lastSpeed", "100")) if value else 0
+        element.set(state, str(int(value > 0)))
+        for attr in speed_attrs:
+            element.set(attr, str(speed))
+        if speed:
+            element.set("lastSpeed", str(speed))
+
+    def _set_equipment(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["equipmentId"])) is None:
+            return
+        value = params["isOn"]
+        match _local_name(element.tag):
+            case "Relay":
+                element.set("relayState", str(int(value > 0)))
+            case "ValveActuator":
+                element.set("valveActuatorState", str(int(value > 0)))
+            case "Group":
+                element.set("groupState", str(int(value > 0)))
+            case "ColorLogic-Light":
+                element.set("lightState", str((ColorLogicPowerState.ACTIVE if value else ColorLogicPowerState.OFF).value))
+            case "Pump":
+                self._set_speed(element, "pumpState", ("pumpSpeed",), value)
+            case "Filter":
+                self._set_speed(element, "filterState", ("filterSpeed", "reportedFilterSpeed"), value)
+            case "Heater":
+                element.set("enable", "yes" if value else "no")
+
+    def _set_filter_speed(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["FilterID"], "Filter")) is not None:
+            self._set_speed(element, "filterState", ("filterSpeed", "reportedFilterSpeed"), params["Speed"])
+
+    def _set_heater(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["HeaterID"], "VirtualHeater")) is not None:
+            element.set("Current-Set-Point", str(params["Temp"]))
+
+    def _set_solar_set_point(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["HeaterID"], "VirtualHeater")) is not None:
+            element.set("SolarSetPoint", str(params["Temp"]))
+
+    def _set_heater_mode(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["HeaterID"], "VirtualHeater")) is not None:
+            element.set("Mode", str(params["Mode"]))
+
+    def _set_heater_enable(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["HeaterID"], "VirtualHeater", "Heater")) is not None:
+            element.set("enable", "yes" if params["Enabled"] else "no")
+
+    def _set_chlorinator_enable(self, params: dict[str, int]) -> None:
+        if (element := self._bow_device(params["poolId"], "Chlorinator")) is not None:
+            element.set("enable", "yes" if params["Enabled"] else "no")
+
+    def _set_chlorinator_params(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["ChlorID"], "Chlorinator")) is not None:
+            element.set("Timed-Percent", str(params["TimedPercent"]))
+            element.set("operatingMode", str(params["OpMode"]))
+
+    def _set_light_show(self, params: dict[str, int]) -> None:
+        if (element := self._device(params["LightID"], "ColorLogic-Light")) is not None:
+            element.set("lightState", str(ColorLogicPowerState.ACTIVE.value))
+            element.set("currentShow", str(params["Show"]))
+            element.set("speed", str(params["Speed"]))
+            element.set("brightness", str(params["Brightness"]))
+
+    def _set_spillover(self, params: dict[str, int]) -> None:
+        if (element := self._bow_device(params["poolId"], "Filter")) is not None:
+            position = FilterValvePosition.SPILLOVER if params["Speed"] else FilterValvePosition.POOL_ONLY
+            element.set("valvePosition", str(position.value))
+            if params["Speed"]:
+                self._set_speed(element, "filterState", ("filterSpeed", "reportedFilterSpeed"), params["Speed"])
@@ -0,0 +1,162 @@
+"""A UDP endpoint speaking the OmniLogic protocol on behalf of a SimulatedController."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import xml.etree.ElementTree as ET
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, cast
+
+from pyomnilogic_local.api.constants import OMNI_RETRANSMIT_COUNT, OMNI_RETRANSMIT_TIME, XML_ENCODING, XML_NAMESPACE
+from pyomnilogic_local.api.exceptions import OmniMessageFormatError
+from pyomnilogic_local.api.protocol import OmniLogicMessage
+from pyomnilogic_local.omnitypes import MessageType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .controller import SimulatedController
+
+_LOGGER = logging.getLogger(__name__)
+
+# Responses larger than this are split into a LeadMessage followed by BlockMessages, as the real controller does
+BLOCK_SIZE = 1024
+# The client strips this many bytes of header from each BlockMessage
+BLOCK_HEADER = bytes(8)
+# How many request IDs we remember so that retransmitted requests are acknowledged again but not applied twice
+RECENT_REQUESTS = 256
+
+
+@dataclass(frozen=True)
+class NetworkConditions:
+    """Degradations applied to every datagram the simulator sends or receives."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    loss: float = 0.0
+
+    def delay(self) -> float:
+        return self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+
+    def dropped(self) -> bool:
+        return self.loss > 0 and random.random() < self.loss
+
+
+class SimulatorProtocol(asyncio.DatagramProtocol):
+    """Answers requests from pyomnilogic_local clients using a SimulatedController."""
+
+    transport: asyncio.DatagramTransport
+
+    def __init__(self, controller: SimulatedController, conditions: NetworkConditions) -> None:
+        self.controller = controller
+        self.conditions = conditions
+        self.requests: Counter[str] = Counter()
+        self.dropped = 0
+        self._recent_requests: deque[int] = deque(maxlen=RECENT_REQUESTS)
+        # Responses we are waiting for the client to acknowledge, with their retransmission timer and what to do once acknowledged
+        self._unacked: dict[int, tuple[asyncio.TimerHandle, Callable[[], None] | None]] = {}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast("asyncio.DatagramTransport", transport)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        for timer, _ in self._unacked.values():
+            timer.cancel()
+        self._unacked.clear()
+
+    def datagram_received(self, data: bytes, addr: tuple[str | Any, int]) -> None:
+        if self.conditions.dropped():
+            self.dropped += 1
+            _LOGGER.debug("dropping datagram from %s", addr)
+            return
+        try:
+            message = OmniLogicMessage.from_bytes(data)
+        except OmniMessageFormatError:
+            _LOGGER.exception("failed to parse datagram from %s", addr)
+            return
+
+        if message.type in {MessageType.XML_ACK, MessageType.ACK}:
+            if (unacked := self._unacked.pop(message.id, None)) is not None:
+                timer, on_acked = unacked
+                timer.cancel()
+                if on_acked is not None:
+                    on_acked()
+            return
+
+        self._send(OmniLogicMessage(message.id, MessageType.ACK), addr)
+        if message.id in self._recent_requests:
+            _LOGGER.debug("acknowledged retransmitted message ID %s again", message.id)
+            return
+        self._recent_requests.append(message.id)
+        self.requests[message.type.name] += 1
+
+        response = self.controller.handle_request(message.type, message.payload.decode("utf-8").strip("\x00"))
+        if response is not None:
+            self._send_response(*response, addr)
+
+    def _send_response(self, msg_type: MessageType, body: str, addr: tuple[str | Any, int]) -> None:
+        payload = zlib.compress(body.encode("utf-8"))
+        msg_id = random.randrange(2**31)
+        if len(payload) <= BLOCK_SIZE:
+            self._send_reliably(_compressed(OmniLogicMessage(msg_id, msg_type), payload), addr)
+            return
+
+        blocks = [payload[start : start + BLOCK_SIZE] for start in range(0, len(payload), BLOCK_SIZE)]
+        lead = ET.Element("Response", {"xmlns": XML_NAMESPACE})
+        ET.SubElement(lead, "Name").text = "LeadMessage"
+        parameters = ET.SubElement(lead, "Parameters")
+        for name, value in (("SourceOpId", msg_type.value), ("MsgSize", len(payload)), ("MsgBlockCount", len(blocks)), ("Type", 0)):
+            ET.SubElement(parameters, "Parameter", name=name, dataType="int").text = str(value)
+        lead_message = OmniLogicMessage(msg_id, MessageType.MSP_LEADMESSAGE, ET.tostring(lead, xml_declaration=True, encoding=XML_ENCODING))
+        lead_message.compressed = True
+
+        def _send_blocks() -> None:
+            # The client orders the blocks by their message ID
+            for index, block in enumerate(blocks, start=1):
+                self._send_reliably(_compressed(OmniLogicMessage(msg_id + index, MessageType.MSP_BLOCKMESSAGE), BLOCK_HEADER + block), addr)
+
+        # The client can only make sense of the blocks once it has the LeadMessage, so they wait for it to be acknowledged
+        self._send_reliably(lead_message, addr, _send_blocks)
+
+    def _send_reliably(
+        self, message: OmniLogicMessage, addr: tuple[str | Any, int], on_acked: Callable[[], None] | None = None, attempt: int = 0
+    ) -> None:
+        """Send a message, retransmitting it until the client acknowledges it like the real controller does."""
+        self._send(message, addr)
+        if attempt >= OMNI_RETRANSMIT_COUNT:
+            self._unacked.pop(message.id, None)
+            _LOGGER.warning("giving up on %s ID %s to %s, it was never acknowledged", message.type.name, message.id, addr)
+            return
+        timer = asyncio.get_running_loop().call_later(OMNI_RETRANSMIT_TIME, self._send_reliably, message, addr, on_acked, attempt + 1)
+        self._unacked[message.id] = (timer, on_acked)
+
+    def _send(self, message: OmniLogicMessage, addr: tuple[str | Any, int]) -> None:
+        if self.conditions.dropped():
+            self.dropped += 1
+            _LOGGER.debug("dropping %s to %s", message.type.name, addr)
+            return
+        data = bytes(message)
+        if delay := self.conditions.delay():
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, data, addr)
+        else:
+            self.transport.sendto(data, addr)
+
+
+def _compressed(message: OmniLogicMessage, payload: bytes) -> OmniLogicMessage:
+    message.payload = payload
+    message.compressed = True
+    return message
+
+
+async def async_serve(
+    controller: SimulatedController, host: str = "0.0.0.0", port: int = 10444, conditions: NetworkConditions | None = None
+) -> tuple[asyncio.DatagramTransport, SimulatorProtocol]:
+    """Start serving the controller on a UDP port, close the returned transport to stop."""
+    transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: SimulatorProtocol(controller, conditions or NetworkConditions()), local_addr=(host, port)
+    )
+    return transport, protocol
@@ -0,0 +1 @@
+"""Tests for the OmniLogic Local integration."""
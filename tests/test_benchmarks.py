@@ -0,0 +1,23 @@
+"""Smoke tests that the benchmarks still run against the installed Home Assistant, with tiny sizes so that they finish quickly."""
+
+from __future__ import annotations
+
+from benchmarks import device_walk, index_memory, poll_stagger, suite
+
+
+def test_device_walk() -> None:
+    assert device_walk.run(10, 1)["devices"]
+
+
+def test_index_memory() -> None:
+    assert index_memory.run(10, 2)
+
+
+async def test_suite() -> None:
+    run = await suite.async_run_size(10, iterations=1)
+    assert run["entities"] > 0
+    assert all(seconds >= 0 for seconds in run["metrics"].values())
+
+
+async def test_poll_stagger() -> None:
+    assert await poll_stagger.async_run_mode(staggered=True, controllers=2, duration=0.5)
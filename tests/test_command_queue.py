@@ -0,0 +1,31 @@
+"""Tests for the queue that sends commands to the controller."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.omnilogic_local.command_queue import OmniLogicCommandQueue
+
+
+async def _async_fail() -> None:
+    msg = "controller did not respond"
+    raise TimeoutError(msg)
+
+
+async def _async_succeed() -> None:
+    pass
+
+
+async def test_failed_command_not_counted_as_sent() -> None:
+    queue = OmniLogicCommandQueue(MagicMock(), asyncio.Semaphore(1))
+
+    with pytest.raises(TimeoutError):
+        await queue.async_send("set_equipment", 7, _async_fail)
+    await queue.async_send("set_equipment", 7, _async_succeed)
+
+    stats = queue.stats["set_equipment"]
+    assert (stats.sent, stats.failed) == (1, 1)
+    assert stats.mean_latency == stats.total_latency
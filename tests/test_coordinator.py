@@ -0,0 +1,24 @@
+"""Tests for how the coordinator polls the controller and notifies its listeners."""
+
+from __future__ import annotations
+
+from benchmarks.harness import async_create_coordinator, async_create_hass
+from custom_components.omnilogic_local.const import POLL_STATS_CONTEXT
+
+
+async def test_poll_stats_report_this_poll() -> None:
+    async with async_create_hass() as hass:
+        coordinator, _ = await async_create_coordinator(hass, 30)
+        fanouts: list[float | None] = []
+        # An entity listening for a system ID, so there is some fan-out to time
+        unsub_entity = coordinator.async_add_listener(lambda: None, 7)
+        unsub_poll_stats = coordinator.async_add_listener(lambda: fanouts.append(coordinator.poll_stats.last_fanout), POLL_STATS_CONTEXT)
+
+        coordinator.poll_stats.last_fanout = None
+        await coordinator.async_refresh()
+        assert fanouts == [coordinator.poll_stats.last_fanout]
+        assert fanouts[0] is not None
+
+        unsub_entity()
+        unsub_poll_stats()
+        await coordinator.async_shutdown()
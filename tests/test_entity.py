@@ -0,0 +1,134 @@
+"""Tests for how entities are registered and kept in step with the MSP config."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from typing import TYPE_CHECKING, cast
+
+from homeassistant.helpers import entity_registry as er
+
+from benchmarks.harness import SyntheticAPI, async_create_coordinator, async_create_hass, async_set_up_platform
+
+if TYPE_CHECKING:
+    import pytest
+    from homeassistant.components.switch import SwitchEntity
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import EntityPlatform
+
+    from custom_components.omnilogic_local.coordinator import OmniLogicCoordinator
+
+DEVICE_COUNT = 30
+# A relay of the synthetic controller, and the name it is generated with
+RELAY_SYSTEM_ID = 7
+RELAY_NAME = "Relay 7"
+
+
+async def _async_set_up_switches(
+    hass: HomeAssistant, entry: ConfigEntry | None = None, api: SyntheticAPI | None = None
+) -> tuple[OmniLogicCoordinator, ConfigEntry, EntityPlatform]:
+    coordinator, entry = await async_create_coordinator(hass, DEVICE_COUNT, entry=entry, api=api)
+    platform = await async_set_up_platform(hass, entry, "switch")
+    return coordinator, entry, platform
+
+
+async def _async_unload(coordinator: OmniLogicCoordinator, platform: EntityPlatform) -> None:
+    await platform.async_reset()
+    await coordinator.async_shutdown()
+
+
+def _state(hass: HomeAssistant, entity_id: str) -> str | None:
+    return state.state if (state := hass.states.get(entity_id)) is not None else None
+
+
+def _relay_entries(hass: HomeAssistant, entry: ConfigEntry) -> list[er.RegistryEntry]:
+    return [
+        registry_entry
+        for registry_entry in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        if registry_entry.domain == "switch" and registry_entry.unique_id.split()[2] == str(RELAY_SYSTEM_ID)
+    ]
+
+
+async def test_rename_keeps_entity() -> None:
+    async with async_create_hass() as hass:
+        coordinator, entry, platform = await _async_set_up_switches(hass)
+        [before] = _relay_entries(hass, entry)
+        assert before.original_name == RELAY_NAME
+
+        api = cast("SyntheticAPI", coordinator.omni._api)
+        api.mspconfig = api.mspconfig.replace(f"<Name>{RELAY_NAME}</Name>", "<Name>Renamed Relay</Name>")
+        await coordinator.async_refresh_config()
+        await hass.async_block_till_done()
+
+        # Renamed in place, and still the same entity once the config entry is reloaded
+        [renamed] = _relay_entries(hass, entry)
+        assert (renamed.entity_id, renamed.unique_id, renamed.original_name) == (before.entity_id, before.unique_id, "Renamed Relay")
+        await _async_unload(coordinator, platform)
+        coordinator, _, platform = await _async_set_up_switches(hass, entry, api)
+        [reloaded] = _relay_entries(hass, entry)
+        assert (reloaded.entity_id, reloaded.unique_id) == (before.entity_id, before.unique_id)
+        assert hass.states.get(before.entity_id) is not None
+        await _async_unload(coordinator, platform)
+
+
+async def test_unique_id_migrated() -> None:
+    async with async_create_hass() as hass:
+        coordinator, entry, platform = await _async_set_up_switches(hass)
+        [registered] = _relay_entries(hass, entry)
+        await _async_unload(coordinator, platform)
+
+        # As it was registered before the unique ID stopped including the name
+        er.async_get(hass).async_update_entity(registered.entity_id, new_unique_id=f"{registered.unique_id} {RELAY_NAME}")
+
+        coordinator, _, platform = await _async_set_up_switches(hass, entry, cast("SyntheticAPI", coordinator.omni._api))
+        [migrated] = _relay_entries(hass, entry)
+        assert (migrated.entity_id, migrated.unique_id) == (registered.entity_id, registered.unique_id)
+        await _async_unload(coordinator, platform)
+
+
+async def test_removed_device_added_again() -> None:
+    async with async_create_hass() as hass:
+        coordinator, entry, platform = await _async_set_up_switches(hass)
+        [registered] = _relay_entries(hass, entry)
+        api = cast("SyntheticAPI", coordinator.omni._api)
+        mspconfig = api.mspconfig
+
+        api.mspconfig = re.sub(rf"<Relay><System-Id>{RELAY_SYSTEM_ID}</System-Id>.*?</Relay>", "", mspconfig)
+        await coordinator.async_refresh_config()
+        await hass.async_block_till_done()
+        assert not _relay_entries(hass, entry)
+        assert hass.states.get(registered.entity_id) is None
+
+        api.mspconfig = mspconfig
+        await coordinator.async_refresh_config()
+        await hass.async_block_till_done()
+        [added] = _relay_entries(hass, entry)
+        assert added.unique_id == registered.unique_id
+        assert hass.states.get(added.entity_id) is not None
+        await _async_unload(coordinator, platform)
+
+
+async def test_optimistic_state_outlasts_early_poll(caplog: pytest.LogCaptureFixture) -> None:
+    async with async_create_hass() as hass:
+        # A controller that ignores commands, so every poll reports the relay off
+        coordinator, entry, platform = await _async_set_up_switches(hass, api=SyntheticAPI(DEVICE_COUNT, changed_fraction=0))
+        coordinator.command_refresh_delay = 0.2
+        [registered] = _relay_entries(hass, entry)
+        assert _state(hass, registered.entity_id) == "off"
+
+        await cast("SwitchEntity", platform.entities[registered.entity_id]).async_turn_on()
+        assert _state(hass, registered.entity_id) == "on"
+
+        # Polled before the controller had time to act on the command
+        await coordinator.async_refresh()
+        assert _state(hass, registered.entity_id) == "on"
+        assert "reverting" not in caplog.text
+
+        await asyncio.sleep(coordinator.command_refresh_delay)
+        with caplog.at_level(logging.WARNING):
+            await coordinator.async_refresh()
+        assert _state(hass, registered.entity_id) == "off"
+        assert "reverting" in caplog.text
+        await _async_unload(coordinator, platform)